@@ -4,23 +4,39 @@ No agent framework. Loop: Reason -> Decide -> Act -> Observe -> Update -> Reflec
 Sales-rep assistant: you represent a company (who you're selling for); prospect is the company you're exploring/contacting.
 """
 
+import asyncio
+import atexit
+import contextvars
 import logging
+import logging.handlers
 import os
+import queue
 import re
+import threading
+import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import permutations
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from config import (
+    BATCH_MAX_CONCURRENCY,
+    CONDENSE_KEEP_FIRST,
+    CONDENSE_MAX_TURNS,
+    CONDENSE_RATIO,
+    CONFIDENCE_STOP_THRESHOLD,
     DECIDE_PARSE_RETRIES,
+    FUSE_STEPS,
     MAX_STEPS,
-    MEMORY_RECENT_K,
     MIN_CONFIDENCE_TO_STOP,
-    MODEL_ERROR_RETRIES,
+    SIMPLE_PROFILE_MIN_CHARS,
+    SIMPLE_TASK_MAX_CHARS,
+    TOOL_PREFETCH,
 )
-from decisions import Decision, parse_decision, parse_reflection
-from local_llm import complete, complete_structured
+from decisions import Decision, DecisionParseError, is_decision_dict, parse_decision, parse_fused_step, parse_reflection
+from local_llm import JsonObjectScanner, acomplete, acomplete_fused, acomplete_structured, arun_llm_call, complete, stream_complete
 from memory import AgentMemory
-from tools import get_tool_registry, run_tool
+from tools import arun_tool, discard_prefetches, get_tool_registry, prefetch, render_tool_description
 
 logger = logging.getLogger("scratch_agent")
 logger.setLevel(logging.INFO)
@@ -29,82 +45,325 @@ if not logger.handlers:
     h.setLevel(logging.INFO)
     logger.addHandler(h)
 
+LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
 
-def _build_context(task: str, memory: AgentMemory, turn_history: List[Dict[str, Any]]) -> str:
-    """Build context string for Reason/Decide: task + memory + last N turns."""
-    mem_summary = memory.get_summary()
+# Id of the sales-rep run a coroutine/thread is working for; stamped onto its log records.
+_RUN_ID: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("run_id", default=None)
+
+
+class _RunIdFilter(logging.Filter):
+    """Stamp each record with the run_id of the flow that emitted it (read from the context var)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _RUN_ID.get()
+        return True
+
+
+class _RunFileRouter(logging.Handler):
+    """
+    Listener-side handler: appends each record to logs/run_<run_id>.txt.
+    Records without a run_id (e.g. plain run_agent calls) are not written to a file.
+    A run's file is opened on its first record and closed by its end-of-run marker.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(logging.INFO)
+        self._files: Dict[str, logging.FileHandler] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        run_id = getattr(record, "run_id", None)
+        if not run_id:
+            return
+        handler = self._files.get(run_id)
+        if getattr(record, "run_end", False):
+            if handler is not None:
+                handler.close()
+                del self._files[run_id]
+            return
+        if handler is None:
+            handler = logging.FileHandler(os.path.join(LOG_DIR, f"run_{run_id}.txt"), encoding="utf-8")
+            self._files[run_id] = handler
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self._files.values():
+            handler.close()
+        self._files.clear()
+        super().close()
+
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_setup_lock = threading.Lock()
+
+
+def _ensure_run_logging() -> None:
+    """
+    One-time setup of per-run log files: a QueueHandler on the logger feeds a single
+    QueueListener thread that routes records to their run's file. Safe under concurrent runs.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    with _log_setup_lock:
+        if _log_listener is not None:
+            return
+        os.makedirs(LOG_DIR, exist_ok=True)
+        queue_handler = logging.handlers.QueueHandler(_log_queue)
+        queue_handler.setLevel(logging.INFO)
+        queue_handler.addFilter(_RunIdFilter())
+        logger.addHandler(queue_handler)
+        listener = logging.handlers.QueueListener(_log_queue, _RunFileRouter(), respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        _log_listener = listener
+
+
+def _end_run_log(run_id: str) -> None:
+    """Queue the end-of-run marker so the listener closes the run's file after its last record."""
+    _log_queue.put_nowait(logging.makeLogRecord({"run_id": run_id, "run_end": True, "levelno": logging.INFO}))
+
+# Literal section headers of the final sales-rep answer, with optional words that may follow
+# each one before its ':' / '-' separator. Located with str.find on the upper-cased text.
+_SECTION_HEADERS = (
+    ("VALUE HYPOTHESIS", "value_hypothesis", ()),
+    ("MESSAGING", "messaging_angle", ("ANGLE",)),
+    ("SUPPORTING EVIDENCE", "supporting_evidence", ("OR ASSUMPTIONS",)),
+)
+
+# Regex fallback for the same headers (case-insensitive, allow variations), compiled once.
+_SECTION_PATTERNS = [
+    (re.compile(p, re.DOTALL | re.IGNORECASE), key)
+    for p, key in (
+        (r"VALUE\s*HYPOTHESIS\s*[:\-]\s*(.+?)(?=MESSAGING|SUPPORTING|$)", "value_hypothesis"),
+        (r"MESSAGING\s*(?:ANGLE)?\s*[:\-]\s*(.+?)(?=VALUE|SUPPORTING|$)", "messaging_angle"),
+        (r"SUPPORTING\s*EVIDENCE(?:\s*OR\s*ASSUMPTIONS)?\s*[:\-]\s*(.+?)(?=VALUE|MESSAGING|$)", "supporting_evidence"),
+    )
+]
+
+
+@dataclass(slots=True)
+class Turn:
+    """
+    One entry of the turn history. first/last are the absolute step numbers it covers
+    (equal for a raw turn; a range for a condensed summary turn). preview is the observation
+    sliced once for prompts.
+    """
+    first: int
+    last: int
+    action: str
+    observation: str
+    preview: str
+    summary: bool = False
+
+    @property
+    def label(self) -> str:
+        return str(self.first) if self.first == self.last else f"{self.first}-{self.last}"
+
+
+def _build_static_prefix(task: str, tool_descriptions: str) -> str:
+    """
+    Build the part of every prompt that never changes during a run: task + available tools.
+    It is computed once and always emitted first, so the prompt prefix stays byte-identical
+    across steps and the LLM server can reuse its prompt (KV) cache for it.
+    The (possibly multi-KB) task text is copied exactly once, into the task fragment.
+    """
+    task_fragment = f"Task: {task}\n\n"
+    return "".join((task_fragment, "Available tools:\n", tool_descriptions, "\n\n"))
+
+
+def _build_context(memory: AgentMemory, turn_history: List[Turn]) -> str:
+    """
+    Build the per-step part of the context, appended after the static prefix.
+    Memory comes first as a deterministic pack (saved notes with stable ids, then the structured state);
+    the volatile turns are kept out of it in a separate trailing block: the pinned/condensed head of the
+    history (see _amaybe_condense) followed by the last 5 raw turns. Turns are labelled with their
+    absolute number, stored on the turn when it was appended, so a turn keeps the same label in every
+    later prompt however the window slides.
+    """
+    mem_pack = memory.get_pack()
+    head_end = max((i + 1 for i, t in enumerate(turn_history) if t.summary), default=0)
+    shown = turn_history[:head_end] + turn_history[head_end:][-5:]
     history_str = "\n".join(
-        f"Turn {i+1}: {t.get('action', '')} -> {t.get('observation', '')[:200]}"
-        for i, t in enumerate(turn_history[-5:])
+        f"Turn {t.label}: {t.action} -> {t.preview}" for t in shown
     ) or "(no turns yet)"
-    return f"Task: {task}\n\nMemory (prior findings):\n{mem_summary}\n\nRecent turns:\n{history_str}"
+    return f"Memory (prior findings):\n{mem_pack}\n\nRecent turns:\n{history_str}"
+
+
+def _has_sections(text: str) -> bool:
+    """True when text is structured: several paragraphs, or several heading-like lines."""
+    paragraphs = [p for p in text.split("\n\n") if p.strip()]
+    headings = [
+        line for line in text.splitlines()
+        if line.lstrip().startswith("#") or (line.rstrip().endswith(":") and len(line.strip()) < 80)
+    ]
+    return len(paragraphs) >= 3 or len(headings) >= 2
+
+
+def _classify_complexity(task: str, profile_text: Optional[str]) -> Literal["simple", "normal"]:
+    """
+    Cheap length/shape heuristic (no LLM call). With FUSE_STEPS off, "simple" tasks still get
+    one combined Reason + Decide + Reflect call per step instead of three.
+    """
+    profile = (profile_text or "").strip()
+    if profile:
+        if len(profile) > SIMPLE_PROFILE_MIN_CHARS and _has_sections(profile):
+            return "simple"
+        return "normal"
+    return "simple" if len(task.strip()) < SIMPLE_TASK_MAX_CHARS else "normal"
 
 
 def _call_model(prompt: str, step_name: str) -> str:
-    """Call local LLM with retries on connection/API errors."""
-    last_err: Optional[Exception] = None
-    for attempt in range(MODEL_ERROR_RETRIES + 1):
-        try:
-            return complete(prompt) or ""
-        except Exception as e:
-            last_err = e
-            logger.warning("Model error (%s) attempt %s: %s", step_name, attempt + 1, e)
-            if attempt == MODEL_ERROR_RETRIES:
-                raise
-    raise last_err or RuntimeError(f"{step_name} failed after retries")
+    """Call local LLM. Connection errors are already retried by the transport in local_llm."""
+    try:
+        return complete(prompt) or ""
+    except Exception as e:
+        logger.warning("Model error (%s): %s", step_name, e)
+        raise
 
 
-def _reason(context: str) -> str:
+async def _acall_model(prompt: str, step_name: str) -> str:
+    """Async twin of _call_model; does not block the event loop."""
+    try:
+        return await acomplete(prompt) or ""
+    except Exception as e:
+        logger.warning("Model error (%s): %s", step_name, e)
+        raise
+
+
+async def _amaybe_condense(turn_history: List[Turn]) -> None:
+    """
+    Rolling condenser for long runs: once the history exceeds CONDENSE_MAX_TURNS, keep the first
+    CONDENSE_KEEP_FIRST turns pinned, summarize the turns up to CONDENSE_RATIO of the history into one
+    dense synthetic turn, and keep the recent tail raw. Modifies turn_history in place.
+    If the summary call fails, the history is left as is.
+    """
+    n = len(turn_history)
+    if n <= CONDENSE_MAX_TURNS:
+        return
+    start, end = CONDENSE_KEEP_FIRST, int(n * CONDENSE_RATIO)
+    if end - start < 2:
+        return
+    steps = "\n".join(
+        f"- {t.action} -> {t.observation[:500]}" for t in turn_history[start:end]
+    )
+    prompt = (
+        "Summarize these agent steps into a single dense paragraph of actions, findings, and decisions. "
+        "Keep concrete facts (names, numbers, sources); drop repetition.\n\n"
+        f"{steps}"
+    )
+    try:
+        summary = (await _acall_model(prompt, "condense")).strip()
+    except Exception as e:
+        logger.warning("Condense step failed: %s", e)
+        return
+    if not summary:
+        return
+    turn_history[start:end] = [Turn(
+        first=turn_history[start].first,
+        last=turn_history[end - 1].last,
+        action=f"summary of {end - start} earlier turns",
+        observation=summary,
+        preview=summary,
+        summary=True,
+    )]
+    logger.info("Condensed %s turns into one summary turn (%s chars).", end - start, len(summary))
+
+
+async def _areason(static_prefix: str, context: str) -> str:
     """Reason step: call local LLM with situation; what do we know, what is missing?"""
     prompt = (
-        f"{context}\n\n"
+        f"{static_prefix}{context}\n\n"
         "As the agent, briefly state: what do you know so far and what is still missing? One short paragraph."
     )
     try:
-        out = _call_model(prompt, "reason")
-        logger.info("Reasoning: %s", (out or "")[:500])
+        out = await _acall_model(prompt, "reason")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Reasoning: %s", (out or "")[:500])
         return out or ""
     except Exception as e:
         logger.error("Reason step failed: %s", e)
         return f"(Reasoning failed: {e})"
 
 
-def _decide(context: str, reason_text: str, tool_descriptions: str) -> Decision:
+def _stream_decision(prompt: str) -> Tuple[str, Optional[Decision]]:
+    """
+    Stream the Decide reply and parse it as soon as a balanced JSON object has arrived, then stop
+    the stream (closing it cancels the rest of the generation). Blocking; run it in a worker thread.
+    Returns (text received, Decision or None if no JSON decision could be parsed).
+    """
+    parts: List[str] = []
+    scanner = JsonObjectScanner()
+    stream = stream_complete(prompt)
+    try:
+        for chunk in stream:
+            parts.append(chunk)
+            if scanner.feed(chunk):
+                text = "".join(parts)
+                try:
+                    return text, parse_decision(text, strict=True)
+                except DecisionParseError:
+                    pass
+    finally:
+        stream.close()
+    text = "".join(parts)
+    try:
+        return text, parse_decision(text, strict=True)
+    except DecisionParseError:
+        return text, None
+
+
+def _log_decision(decision: Decision) -> None:
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        "Decision: next_action=%s tool_id=%s should_stop=%s should_revise=%s confidence=%s reason=%s",
+        decision.next_action,
+        decision.tool_id or "(none)",
+        decision.should_stop,
+        decision.should_revise,
+        decision.confidence,
+        (decision.reasoning or "")[:200],
+    )
+
+
+async def _adecide(static_prefix: str, context: str, reason_text: str) -> Decision:
     """
     Decide step: model outputs what to do next (action, tool?, args, confidence, stop?, revise?).
     This is the single place where the agent decides what to do next.
+    One JSON-mode (structured) call is made first; only if it yields nothing usable is the plain
+    text reply requested, streamed and cut off as soon as its JSON decision is complete.
     """
     prompt = (
-        f"{context}\n\n"
+        f"{static_prefix}{context}\n\n"
         f"Your reasoning so far: {reason_text[:500]}\n\n"
-        f"Available tools:\n{tool_descriptions}\n\n"
         "Decide: What should I do next? "
         "If you lack company/industry details or the profile is thin: set should_stop to false and use a tool. "
         "Use search_web with a concrete query (e.g. company name, industry trends) or extract_insights on the profile. "
+        "To run several independent tools in one step (e.g. search_web and extract_insights on the first step), give tool_calls instead of tool_id/tool_input: "
+        "[{\"tool_id\": \"search_web\", \"tool_input\": {\"query\": \"...\"}}, {\"tool_id\": \"extract_insights\", \"tool_input\": {}}]; they run concurrently. "
         "Only set should_stop to true when you have enough to write concrete VALUE HYPOTHESIS, MESSAGING ANGLE, and SUPPORTING EVIDENCE. "
         "Do not stop with 'insufficient information'—use search_web first to gather more, then stop only when confident. "
         "After search_web or extract_insights, use save_note to store key facts (content: string) so they appear in the next step and you avoid hallucination. "
-        "Respond with reasoning and a JSON object: next_action, tool_id (e.g. 'search_web', 'extract_insights', or 'save_note'), tool_input (e.g. {\"query\": \"...\"} or {\"content\": \"...\"}), confidence (0-1), should_stop, should_revise, reasoning."
+        "Respond with reasoning and a JSON object: next_action, tool_id (e.g. 'search_web', 'extract_insights', 'save_note', or 'batch'), tool_input (e.g. {\"query\": \"...\"} or {\"content\": \"...\"}), confidence (0-1), should_stop, should_revise, reasoning."
     )
     last_error: Optional[Exception] = None
     for attempt in range(DECIDE_PARSE_RETRIES + 1):
         try:
-            raw = _call_model(prompt, "decide")
-            structured = complete_structured(prompt)  # placeholder returns dict; real LLM may only return raw
-            decision = parse_decision(raw, structured_fallback=structured)
-            logger.info(
-                "Decision: next_action=%s tool_id=%s should_stop=%s should_revise=%s confidence=%s reason=%s",
-                decision.next_action,
-                decision.tool_id or "(none)",
-                decision.should_stop,
-                decision.should_revise,
-                decision.confidence,
-                (decision.reasoning or "")[:200],
-            )
+            # Only cache a reply that parses into a Decision; the context-free retry prompt is never cached
+            structured = await acomplete_structured(prompt, accept=is_decision_dict, use_cache=attempt == 0)
+            # A JSON-mode reply that is not a usable decision (no decision keys, or fields that do not
+            # parse) falls back to the streamed text reply on the same prompt
+            if structured and is_decision_dict(structured):
+                decision = parse_decision("", structured_fallback=structured)
+            else:
+                raw, parsed = await arun_llm_call(_stream_decision, prompt)
+                decision = parsed or parse_decision(raw)
+            _log_decision(decision)
             return decision
         except Exception as e:
             last_error = e
-            logger.warning("Parse decision attempt %s failed: %s", attempt + 1, e)
+            logger.warning("Decide attempt %s failed: %s", attempt + 1, e)
             if attempt < DECIDE_PARSE_RETRIES:
                 prompt = (
                     "Your previous response was invalid. Please respond with a JSON object containing exactly: "
@@ -113,60 +372,243 @@ def _decide(context: str, reason_text: str, tool_descriptions: str) -> Decision:
     raise last_error or RuntimeError("Decide step failed after retries")
 
 
-def _act(registry: Dict[str, Any], decision: Decision) -> Tuple[Any, Optional[str]]:
+_FUSED_REASON_PROMPT = "what you know so far and what is still missing (one short paragraph)."
+_FUSED_DECIDE_PROMPT = (
+    "an object with next_action, tool_id, tool_input (object), optional tool_calls (list of {tool_id, tool_input} to run several independent tools at once), "
+    "confidence (0-1), should_stop (bool), should_revise (bool), reasoning (string; when should_stop is true this is your final answer). Use a tool if information is thin; only stop when confident."
+)
+_FUSED_REFLECT_PROMPT = (
+    "an object with critique (the assumptions you are making and whether the information is sufficient), confidence (0-1), should_revise (bool)."
+)
+
+
+async def _afused_step(static_prefix: str, context: str) -> Optional[Tuple[str, Decision, Dict[str, Any]]]:
     """
-    Act step: if tool_id set, run the tool; otherwise no-op.
-    Returns (result, error_message). Error message is set on exception.
+    Reason + Decide + Reflect in a single structured LLM call (default; see FUSE_STEPS).
+    Returns (reasoning, decision, reflection), or None if the reply is unusable so the
+    caller can fall back to the separate steps.
     """
-    if not decision.tool_id:
-        return None, None
     try:
-        result = run_tool(registry, decision.tool_id, decision.tool_input)
-        logger.info("Tool chosen: %s (reason: %s) -> result: %s", decision.tool_id, decision.reasoning[:100], str(result)[:200])
-        return result, None
+        data = await acomplete_fused(
+            f"{static_prefix}{context}",
+            _FUSED_REASON_PROMPT,
+            _FUSED_DECIDE_PROMPT,
+            _FUSED_REFLECT_PROMPT,
+            accept=lambda d: parse_fused_step(d) is not None,
+        )
+    except Exception as e:
+        logger.warning("Fused step failed: %s", e)
+        return None
+    fused = parse_fused_step(data)
+    if fused is None:
+        logger.info("Fused step reply unusable; falling back to separate Reason/Decide/Reflect.")
+        return None
+    reason_text, decision, reflection = fused
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Reasoning: %s", reason_text[:500])
+        _log_decision(decision)
+        logger.info("Reflection: %s | confidence=%s should_revise=%s", reflection["critique"][:300], reflection["confidence"], reflection["should_revise"])
+    return fused
+
+
+async def _arun_call(registry: Dict[str, Any], tool_id: str, tool_input: Dict[str, Any], reason: str) -> Tuple[str, Any, Optional[str]]:
+    """Run one tool call in a worker thread. Returns (tool_id, result, error_message); the error is set on exception."""
+    try:
+        result = await arun_tool(registry, tool_id, tool_input)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Tool chosen: %s (reason: %s) -> result: %s", tool_id, reason[:100], str(result)[:200])
+        return tool_id, result, None
     except Exception as e:
         err_msg = str(e)
-        logger.warning("Tool error: %s -> %s", decision.tool_id, err_msg)
-        return None, err_msg
+        logger.warning("Tool error: %s -> %s", tool_id, err_msg)
+        return tool_id, None, err_msg
+
 
+def _step_calls(decision: Decision) -> List[Dict[str, Any]]:
+    """The decision's tool calls, falling back to the single tool_id/tool_input pair."""
+    if decision.tool_calls:
+        return decision.tool_calls
+    return [{"tool_id": decision.tool_id, "tool_input": decision.tool_input}] if decision.tool_id else []
 
-def _observe(tool_result: Any, tool_error: Optional[str], tool_id: str) -> str:
-    """Observe step: record tool result or error for memory and history."""
-    if tool_error:
-        obs = f"Tool {tool_id} failed: {tool_error}"
-    elif tool_id:
-        obs = f"Tool {tool_id} result: {tool_result}"
+
+async def _aact(registry: Dict[str, Any], decision: Decision) -> List[Tuple[str, Any, Optional[str]]]:
+    """
+    Act step: run the decision's tool calls; no-op if there are none.
+    Independent calls run concurrently (one worker thread each) and come back in call order
+    as (tool_id, result, error_message), so the step takes as long as the slowest tool.
+    The speculative Reflect proceeds meanwhile.
+    """
+    calls = _step_calls(decision)
+    if not calls:
+        return []
+    return list(await asyncio.gather(
+        *(_arun_call(registry, tc["tool_id"], tc["tool_input"], decision.reasoning) for tc in calls)
+    ))
+
+
+def _observe(outcomes: List[Tuple[str, Any, Optional[str]]]) -> str:
+    """Observe step: record each tool result or error (one line per call) for memory and history."""
+    if outcomes:
+        obs = "\n".join(
+            f"Tool {tool_id} failed: {err}" if err else f"Tool {tool_id} result: {result}"
+            for tool_id, result, err in outcomes
+        )
     else:
         obs = "No tool used."
-    logger.info("Observation: %s", obs[:300])
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Observation: %s", obs[:300])
     return obs
 
 
-def _reflect(context: str, observation: str, decision: Decision) -> Dict[str, Any]:
+async def _areflect(static_prefix: str, context: str, observation: str, decision: Decision) -> Dict[str, Any]:
     """
     Reflect step: self-critique. Should we revise or stop?
     Visible in flow: output is logged and used to set should_revise / should_stop.
     """
     prompt = (
-        f"{context}\n\n"
+        f"{static_prefix}{context}\n\n"
         f"Last observation: {observation}\n\n"
         "Evaluate: What assumptions are you making? Is your information sufficient to write VALUE HYPOTHESIS, MESSAGING ANGLE, and SUPPORTING EVIDENCE? "
         "How confident are you (0-1)? If information is still insufficient, recommend continuing and using a tool (e.g. search_web) next step. Should you revise or stop and answer?"
     )
     try:
-        raw = _call_model(prompt, "reflect")
+        raw = await _acall_model(prompt, "reflect")
         parsed = parse_reflection(raw)
-        logger.info("Reflection: %s | confidence=%s should_revise=%s", raw[:300], parsed.get("confidence"), parsed.get("should_revise"))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Reflection: %s | confidence=%s should_revise=%s", raw[:300], parsed.get("confidence"), parsed.get("should_revise"))
         return parsed
     except Exception as e:
         logger.warning("Reflect step failed: %s", e)
         return {"confidence": decision.confidence, "should_revise": False, "critique": str(e)}
 
 
+# Relaxed header: a line starting (after markdown bullets/emphasis) with a value/messaging/supporting word,
+# followed by up to 40 characters of label and a colon, e.g. "**Value proposition:**" or "2. Messaging approach:".
+_FUZZY_HEADER = re.compile(
+    r"^[\s*#>_\-\d.)]*(value|messag\w*|support\w*)\b[^:\n]{0,40}:\s*",
+    re.IGNORECASE | re.MULTILINE,
+)
+_FUZZY_KEYS = {"v": "value_hypothesis", "m": "messaging_angle", "s": "supporting_evidence"}
+
+
+def _fuzzy_sections(text: str) -> Dict[str, str]:
+    """Relaxed-boundary section split for almost-formatted answers; first occurrence of each section wins."""
+    matches = list(_FUZZY_HEADER.finditer(text))
+    sections: Dict[str, str] = {}
+    for n, m in enumerate(matches):
+        key = _FUZZY_KEYS[m.group(1)[0].lower()]
+        end = matches[n + 1].start() if n + 1 < len(matches) else len(text)
+        body = text[m.end():end].strip().strip("*_").strip()
+        if body and key not in sections:
+            sections[key] = body
+    return sections
+
+
+# Headerless answers: seed vocabulary per section for keyword scoring of paragraphs
+_SECTION_VOCAB = (
+    ("value_hypothesis", frozenset((
+        "value", "hypothesis", "problem", "problems", "solve", "solves", "benefit", "benefits",
+        "reduce", "improve", "save", "savings", "roi", "efficiency", "cost", "costs", "help", "helps",
+    ))),
+    ("messaging_angle", frozenset((
+        "messaging", "message", "angle", "pitch", "position", "positioning", "outreach", "emphasize",
+        "highlight", "lead", "tone", "frame", "email", "opener", "narrative",
+    ))),
+    ("supporting_evidence", frozenset((
+        "evidence", "supporting", "assumption", "assumptions", "assume", "source", "sources", "data",
+        "according", "study", "case", "website", "profile", "based", "indicates", "shows",
+    ))),
+)
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_WORD = re.compile(r"[a-z]+")
+# Paragraphs considered, and minimum total keyword hits before the assignment is trusted
+_HEURISTIC_MAX_PARAGRAPHS = 8
+_HEURISTIC_MIN_SCORE = 2
+
+
+def _heuristic_sections(text: str) -> Dict[str, str]:
+    """
+    Deterministic fallback for answers without headers: split into paragraphs, score each against each
+    section's seed vocabulary, and pick the one-paragraph-per-section assignment with the highest total
+    (ties keep document order). Returns {} when there are too few paragraphs or too little signal.
+    """
+    paragraphs = [p.strip() for p in _PARAGRAPH_SPLIT.split(text) if p.strip()][:_HEURISTIC_MAX_PARAGRAPHS]
+    if len(paragraphs) < len(_SECTION_VOCAB):
+        return {}
+    words = [set(_WORD.findall(p.lower())) for p in paragraphs]
+    scores = [[len(vocab & w) for w in words] for _, vocab in _SECTION_VOCAB]
+    best: Tuple[int, ...] = ()
+    best_total = -1
+    for assignment in permutations(range(len(paragraphs)), len(_SECTION_VOCAB)):
+        total = sum(scores[k][i] for k, i in enumerate(assignment))
+        if total > best_total:
+            best, best_total = assignment, total
+    if best_total < _HEURISTIC_MIN_SCORE:
+        return {}
+    return {key: paragraphs[i] for (key, _), i in zip(_SECTION_VOCAB, best)}
+
+
+def _skip_spaces(text: str, i: int) -> int:
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _find_sections(text: str, upper: Optional[str] = None) -> Dict[str, str]:
+    """
+    Single-pass header scan: upper-case once, locate each literal header with str.find,
+    sort the anchors by position and slice the original text between them (original casing kept).
+    A header only counts when it is followed by ':' or '-'. Returns {} when no header is found.
+    Callers that already hold text.upper() can pass it to skip the second case-mapping pass.
+    """
+    if upper is None:
+        upper = text.upper()
+    if len(upper) != len(text):
+        # Case mapping changed the length (e.g. 'ß' -> 'SS'); offsets would not line up.
+        return {}
+    anchors: List[Tuple[int, int, str]] = []
+    for header, key, optional_words in _SECTION_HEADERS:
+        start = upper.find(header)
+        while start != -1:
+            i = _skip_spaces(upper, start + len(header))
+            for word in optional_words:
+                if upper.startswith(word, i):
+                    i = _skip_spaces(upper, i + len(word))
+            if i < len(upper) and upper[i] in ":-":
+                anchors.append((start, i + 1, key))
+                break
+            start = upper.find(header, start + 1)
+    anchors.sort()
+    sections: Dict[str, str] = {}
+    for n, (_, body_start, key) in enumerate(anchors):
+        end = anchors[n + 1][0] if n + 1 < len(anchors) else len(text)
+        sections[key] = text[body_start:end].strip()
+    return sections
+
+
+def _has_final_sections(text: str) -> bool:
+    """True when text has every final-answer section header, each with a non-empty body."""
+    sections = _find_sections(text)
+    return all(sections.get(key) for _, key, _ in _SECTION_HEADERS)
+
+
+def _extract_sections(text: str, out: Dict[str, str], upper: Optional[str] = None) -> None:
+    """Fill out[...] from text: header scan first, the compiled regexes only if no header was found."""
+    sections = _find_sections(text, upper)
+    if sections:
+        out.update(sections)
+        return
+    for pattern, key in _SECTION_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            out[key] = m.group(1).strip()
+
+
 def _parse_sales_rep_output(final_response: str) -> Dict[str, str]:
     """
     Parse final response into value_hypothesis, messaging_angle, supporting_evidence.
-    Prefer section headers (VALUE HYPOTHESIS:, etc.); fallback to LLM extraction.
+    Prefer section headers (VALUE HYPOTHESIS:, etc.), then relaxed headers, then keyword-scored
+    paragraphs; only if all of those fail, fall back to LLM extraction.
     """
     out: Dict[str, str] = {
         "value_hypothesis": "",
@@ -174,19 +616,20 @@ def _parse_sales_rep_output(final_response: str) -> Dict[str, str]:
         "supporting_evidence": "",
     }
     text = (final_response or "").strip()
-    # Section headers (case-insensitive, allow variations)
-    patterns = [
-        (r"VALUE\s*HYPOTHESIS\s*[:\-]\s*(.+?)(?=MESSAGING|SUPPORTING|$)", "value_hypothesis"),
-        (r"MESSAGING\s*(?:ANGLE)?\s*[:\-]\s*(.+?)(?=VALUE|SUPPORTING|$)", "messaging_angle"),
-        (r"SUPPORTING\s*EVIDENCE(?:\s*OR\s*ASSUMPTIONS)?\s*[:\-]\s*(.+?)(?=VALUE|MESSAGING|$)", "supporting_evidence"),
-    ]
-    for pattern, key in patterns:
-        m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-        if m:
-            out[key] = m.group(1).strip()
+    upper = text.upper()
+    _extract_sections(text, out, upper)
     if any(out.values()):
         return out
-    # Fallback: one LLM call to structure the response, then parse once
+    # Almost-formatted answers: retry with relaxed header boundaries before paying for an LLM call
+    if any(word in upper for word in ("VALUE", "MESSAGING", "SUPPORTING")):
+        out.update(_fuzzy_sections(text))
+        if any(out.values()):
+            return out
+    # Headerless answers: keyword-score paragraphs into the three sections (no LLM call)
+    out.update(_heuristic_sections(text))
+    if any(out.values()):
+        return out
+    # Last resort: one LLM call to structure the response, then parse once
     try:
         prompt = (
             f"Convert this sales-rep response into exactly three short sections. "
@@ -197,10 +640,7 @@ def _parse_sales_rep_output(final_response: str) -> Dict[str, str]:
             f"Response to convert:\n{text[:4000]}"
         )
         structured = _call_model(prompt, "parse_output")
-        for pattern, key in patterns:
-            m = re.search(pattern, (structured or "").strip(), re.DOTALL | re.IGNORECASE)
-            if m:
-                out[key] = m.group(1).strip()
+        _extract_sections((structured or "").strip(), out)
         if any(out.values()):
             return out
     except Exception:
@@ -211,7 +651,7 @@ def _parse_sales_rep_output(final_response: str) -> Dict[str, str]:
     return out
 
 
-def run_agent(
+async def arun_agent(
     task: str,
     max_steps: Optional[int] = None,
     tool_registry: Optional[Dict[str, Any]] = None,
@@ -225,72 +665,125 @@ def run_agent(
     """
     max_steps = max_steps or MAX_STEPS
     memory = AgentMemory()
-    turn_history: List[Dict[str, Any]] = []
+    turn_history: List[Turn] = []
     if tool_registry is not None:
         registry = tool_registry
     else:
         registry = get_tool_registry(profile_text=profile_text, memory=memory)
+        if TOOL_PREFETCH and profile_text and profile_text.strip():
+            # Extracting the in-scope profile is almost always an early tool call; run it alongside step 1
+            prefetch(registry, "extract_insights", {})
     tool_descriptions = "\n".join(
-        f"- {tid}: {spec.get('description', '')} (params: {spec.get('parameters', {})})"
-        for tid, spec in registry.items()
+        spec.get("_rendered") or render_tool_description(tid, spec) for tid, spec in registry.items()
     )
+    static_prefix = _build_static_prefix(task, tool_descriptions)
+    fuse = FUSE_STEPS or _classify_complexity(task, profile_text) == "simple"
+    if fuse:
+        logger.info("Using one combined Reason/Decide/Reflect call per step.")
 
     done = False
     step = 0
     final_response = ""
 
-    while not done and step < max_steps:
-        step += 1
-        logger.info("--- Step %s ---", step)
-        context = _build_context(task, memory, turn_history)
-
-        # 1. Reason
-        reason_text = _reason(context)
-
-        # 2. Decide (single place where the agent decides what to do next)
-        decision = _decide(context, reason_text, tool_descriptions)
-
-        # 3. Act
-        tool_result, tool_error = _act(registry, decision)
-
-        # 4. Observe
-        observation = _observe(tool_result, tool_error, decision.tool_id or "")
-
-        # 5. Update: append to memory and turn history so memory influences future decisions
-        memory.add(f"Step {step}: decision={decision.next_action} tool={decision.tool_id or 'none'}; observation: {observation[:150]}")
-        turn_history.append({
-            "action": f"tool={decision.tool_id}" if decision.tool_id else decision.next_action,
-            "observation": observation,
-        })
-
-        # 6. Reflect
-        reflection = _reflect(context, observation, decision)
-        should_revise = decision.should_revise or reflection.get("should_revise", False)
-        if should_revise:
-            logger.info("Revising: looping again without advancing to final answer.")
-            continue
-        # Only accept stop if confidence is high enough (so model iterates with tools until satisfied)
-        confidence_ok = decision.confidence >= MIN_CONFIDENCE_TO_STOP
-        # Reject stop when model said "insufficient" / "need more" but didn't use a tool this step
-        insufficient_but_no_tool = (
-            decision.should_stop
-            and not decision.tool_id
-            and any(
+    try:
+        while not done and step < max_steps:
+            step += 1
+            logger.info("--- Step %s ---", step)
+            await _amaybe_condense(turn_history)
+            context = _build_context(memory, turn_history)
+
+            # 1-2. Reason + Decide (fused: one combined call that also reflects)
+            fused = await _afused_step(static_prefix, context) if fuse else None
+            reflection: Optional[Dict[str, Any]] = None
+            if fused is not None:
+                reason_text, decision, reflection = fused
+            else:
+                reason_text = await _areason(static_prefix, context)
+                # Single place where the agent decides what to do next
+                decision = await _adecide(static_prefix, context, reason_text)
+
+            # 3. Act. When a tool runs, Reflect starts speculatively on the decision itself so its
+            # LLM round-trip is hidden behind the tool I/O.
+            reflect_task: Optional["asyncio.Task[Dict[str, Any]]"] = None
+            calls = _step_calls(decision)
+            if reflection is None and calls:
+                pending = "; ".join(f"Tool {tc['tool_id']} called with {tc['tool_input']}" for tc in calls) + "; result pending."
+                reflect_task = asyncio.create_task(_areflect(static_prefix, context, pending, decision))
+            outcomes = await _aact(registry, decision)
+            tool_error = next((err for _, _, err in outcomes if err), None)
+
+            # 4. Observe
+            observation = _observe(outcomes)
+
+            # 5. Update: append to turn history (memory's structured state is updated once the reflection is in)
+            # The prompt preview is sliced once here rather than on every later step that shows this turn.
+            turn_history.append(Turn(
+                first=step,
+                last=step,
+                action=f"tool={','.join(tc['tool_id'] for tc in calls)}" if calls else decision.next_action,
+                observation=observation,
+                preview=observation[:200],
+            ))
+
+            # 6. Reflect (already done by the fused call). The speculative reflection ran concurrently
+            # with the tool and is always used. If the tool failed, the failure is prepended to its critique
+            # rather than reflecting again: cancelling the task would not stop its request in the worker
+            # thread, so a second call would only add load. The failure is in the next step's context anyway,
+            # and a step that ran a tool cannot early-stop.
+            if reflection is None:
+                if reflect_task is not None:
+                    reflection = await reflect_task
+                    if tool_error:
+                        critique = f"Tool failed: {tool_error}. {reflection.get('critique', '')}".strip()
+                        reflection = {**reflection, "critique": critique}
+                else:
+                    reflection = await _areflect(static_prefix, context, observation, decision)
+            memory.update_structured(decision, observation, reflection)
+            should_revise = decision.should_revise or reflection.get("should_revise", False)
+            if should_revise:
+                logger.info("Revising: looping again without advancing to final answer.")
+                continue
+            # Only accept stop if confidence is high enough (so model iterates with tools until satisfied)
+            confidence_ok = decision.confidence >= MIN_CONFIDENCE_TO_STOP
+            # Reject stop when model said "insufficient" / "need more" but didn't use a tool this step
+            says_insufficient = any(
                 phrase in (decision.reasoning or "").lower()
                 for phrase in ("insufficient", "need more", "need additional", "lack ", "not enough")
             )
-        )
-        if decision.should_stop and (insufficient_but_no_tool or not confidence_ok):
-            if insufficient_but_no_tool:
-                logger.info("Rejecting stop: model said information insufficient but did not use a tool; continuing.")
-            else:
-                logger.info("Rejecting stop: confidence %.2f < %.2f; continuing.", decision.confidence, MIN_CONFIDENCE_TO_STOP)
-            continue
-        if decision.should_stop:
-            done = True
-            final_response = decision.reasoning or observation or "Task completed."
-            logger.info("Stopping. Final response: %s", final_response[:300])
-            break
+            insufficient_but_no_tool = decision.should_stop and not calls and says_insufficient
+            # Early stop: no tool left to run and the reflection is highly confident, even though the model
+            # did not set should_stop itself. Without should_stop the reasoning is normally a plan, not the
+            # answer, so only stop when it already holds every final-answer section; otherwise keep looping.
+            if (
+                not decision.should_stop
+                and not calls
+                and decision.reasoning
+                and not says_insufficient
+                and float(reflection.get("confidence", 0)) >= CONFIDENCE_STOP_THRESHOLD
+                and _has_final_sections(decision.reasoning)
+            ):
+                done = True
+                final_response = decision.reasoning
+                logger.info(
+                    "Early stop: confidence %.2f >= %.2f with no tool to run.",
+                    float(reflection.get("confidence", 0)),
+                    CONFIDENCE_STOP_THRESHOLD,
+                )
+                break
+            if decision.should_stop and (insufficient_but_no_tool or not confidence_ok):
+                if insufficient_but_no_tool:
+                    logger.info("Rejecting stop: model said information insufficient but did not use a tool; continuing.")
+                else:
+                    logger.info("Rejecting stop: confidence %.2f < %.2f; continuing.", decision.confidence, MIN_CONFIDENCE_TO_STOP)
+                continue
+            if decision.should_stop:
+                done = True
+                final_response = decision.reasoning or observation or "Task completed."
+                logger.info("Stopping. Final response: %s", final_response[:300])
+                break
+    finally:
+        # Unclaimed speculative tool runs belong to this run only
+        discard_prefetches(registry)
 
     if not final_response and step >= max_steps:
         final_response = "Max steps reached; no final answer yet."
@@ -299,6 +792,18 @@ def run_agent(
     return final_response
 
 
+def run_agent(
+    task: str,
+    max_steps: Optional[int] = None,
+    tool_registry: Optional[Dict[str, Any]] = None,
+    profile_text: Optional[str] = None,
+) -> str:
+    """Sync wrapper around arun_agent for callers that are not running an event loop."""
+    return asyncio.run(
+        arun_agent(task, max_steps=max_steps, tool_registry=tool_registry, profile_text=profile_text)
+    )
+
+
 SALES_REP_TASK_TEMPLATE = """You are a sales rep assistant.
 
 Who you represent (your company / who you are selling for):
@@ -319,7 +824,7 @@ MESSAGING ANGLE: <your suggested messaging angle>
 SUPPORTING EVIDENCE: <supporting evidence or assumptions>"""
 
 
-def run_sales_rep_flow(
+async def arun_sales_rep_flow(
     my_company_description: str,
     prospect_company_name: str,
     prospect_industry: str,
@@ -329,14 +834,11 @@ def run_sales_rep_flow(
     """
     Sales-rep flow: you represent my_company_description; the prospect is the company you're contacting.
     Returns structured value_hypothesis, messaging_angle, supporting_evidence.
-    Logs are written to the logs/ directory at the end of the run.
-    """
-    log_dir = os.path.join(os.path.dirname(__file__), "logs")
-    os.makedirs(log_dir, exist_ok=True)
-    log_path = os.path.join(log_dir, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-    file_handler = logging.FileHandler(log_path, encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
+    Logs for this run go to logs/run_<YYYYMMDD_HHMMSS>_<id>.txt, even when several runs share the process.
+    """
+    _ensure_run_logging()
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    token = _RUN_ID.set(run_id)
     try:
         task = SALES_REP_TASK_TEMPLATE.format(
             my_company_description=(my_company_description or "").strip(),
@@ -344,14 +846,66 @@ def run_sales_rep_flow(
             industry=prospect_industry,
             profile_text=(prospect_profile_text or "").strip(),
         )
-        final_response = run_agent(
+        final_response = await arun_agent(
             task, max_steps=max_steps, profile_text=(prospect_profile_text or "").strip()
         )
-        parsed = _parse_sales_rep_output(final_response)
+        # May fall back to a blocking LLM call; keep it off the event loop.
+        parsed = await asyncio.to_thread(_parse_sales_rep_output, final_response)
         return parsed
     finally:
-        logger.removeHandler(file_handler)
-        file_handler.close()
+        _end_run_log(run_id)
+        _RUN_ID.reset(token)
+
+
+def run_sales_rep_flow(
+    my_company_description: str,
+    prospect_company_name: str,
+    prospect_industry: str,
+    prospect_profile_text: str,
+    max_steps: Optional[int] = None,
+) -> Dict[str, str]:
+    """Sync wrapper around arun_sales_rep_flow (same arguments and result)."""
+    return asyncio.run(
+        arun_sales_rep_flow(
+            my_company_description,
+            prospect_company_name,
+            prospect_industry,
+            prospect_profile_text,
+            max_steps=max_steps,
+        )
+    )
+
+
+async def arun_sales_rep_flow_batch(
+    prospects: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """
+    Run the sales-rep flow for many prospects concurrently (at most max_concurrency at a time).
+    Each prospect is a dict of arun_sales_rep_flow keyword arguments (my_company_description,
+    prospect_company_name, prospect_industry, prospect_profile_text, optional max_steps).
+    Results are returned in input order. A prospect whose run fails gets empty sections plus an "error" key
+    instead of failing the whole batch.
+    """
+    sem = asyncio.Semaphore(max_concurrency or BATCH_MAX_CONCURRENCY)
+
+    async def _bounded(prospect: Dict[str, Any]) -> Dict[str, str]:
+        async with sem:
+            try:
+                return await arun_sales_rep_flow(**prospect)
+            except Exception as e:
+                logger.error("Sales-rep flow failed for %s: %s", prospect.get("prospect_company_name", "?"), e)
+                return {"value_hypothesis": "", "messaging_angle": "", "supporting_evidence": "", "error": str(e)}
+
+    return await asyncio.gather(*(_bounded(p) for p in prospects))
+
+
+def run_sales_rep_flow_batch(
+    prospects: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """Sync wrapper around arun_sales_rep_flow_batch (same arguments and result)."""
+    return asyncio.run(arun_sales_rep_flow_batch(prospects, max_concurrency=max_concurrency))
 
 
 if __name__ == "__main__":
@@ -6,19 +6,66 @@ Max steps, model name placeholder, memory size, etc.
 import os
 
 MAX_STEPS = 15
-MEMORY_RECENT_K = 10
+# Turn-history condenser: once history exceeds CONDENSE_MAX_TURNS, keep the first CONDENSE_KEEP_FIRST
+# turns, summarize the oldest CONDENSE_RATIO of the history into one turn, and keep the recent tail raw.
+# History gains one turn per step, so the threshold is derived from MAX_STEPS to fire within a run.
+CONDENSE_MAX_TURNS = MAX_STEPS // 2
+CONDENSE_KEEP_FIRST = 1
+CONDENSE_RATIO = 0.75
 # Only allow the agent to stop when confidence >= this (so it iterates with tools until satisfied)
 MIN_CONFIDENCE_TO_STOP = 0.6
+# Stop early (even without should_stop) once a step runs no tool, its reflection is at least this confident,
+# and its reasoning already holds every final-answer section
+CONFIDENCE_STOP_THRESHOLD = 0.9
 DECIDE_PARSE_RETRIES = 1
+# Run Reason + Decide + Reflect as one combined structured LLM call per step instead of three
+# (one request, one prefill of the shared context). Set AGENT_FUSE_STEPS=0 to use the separate
+# calls except for simple tasks (below). An unusable fused reply always falls back to separate calls.
+FUSE_STEPS = os.getenv("AGENT_FUSE_STEPS", "1") != "0"
+# With FUSE_STEPS off, simple tasks still use the combined call.
+# "Simple" = a short task with no profile, or a profile already long and sectioned enough to stand alone.
+SIMPLE_TASK_MAX_CHARS = 200
+SIMPLE_PROFILE_MIN_CHARS = 800
+# Start extract_insights on the in-scope profile in the background when a run begins, so it overlaps the
+# first step's LLM call and is ready when the model picks it. Set AGENT_TOOL_PREFETCH=0 to turn off
+# (e.g. when the Ollama server handles one request at a time and the prefetch would just queue).
+TOOL_PREFETCH = os.getenv("AGENT_TOOL_PREFETCH", "1") != "0"
+# Opt-in: concurrent extract_insights calls of one run (batch invocations, parallel tool_calls) that arrive
+# within this many seconds of each other are packed into one combined LLM request. 0 = off: every call is
+# sent at once with no wait. Set e.g. AGENT_EXTRACT_COALESCE_MS=20 to turn on.
+EXTRACT_COALESCE_WINDOW_SECONDS = float(os.getenv("AGENT_EXTRACT_COALESCE_MS", "0")) / 1000
+# Connection-level retries for Ollama calls (done in local_llm's transport, on a fresh socket)
 MODEL_ERROR_RETRIES = 2
 
+# Max prospects processed at once by arun_sales_rep_flow_batch
+BATCH_MAX_CONCURRENCY = 8
+
 # Ollama configuration (local or remote GPU)
 # Defaults assume Ollama is listening on localhost:11434.
 # Override via environment variables when running remotely, e.g.:
 #   OLLAMA_BASE_URL=http://k2x-gpu-bb:11434
 #   OLLAMA_MODEL=qwen3:8b
+# Decode speed is bound by weight bytes read per token, so the quantization of the model tag matters most.
+# Ollama's default tags (e.g. deepseek-r1:8b) are already 4-bit (Q4_K_M); pick an explicit tag to trade off,
+# e.g. qwen3:8b-q4_K_M (fastest) vs qwen3:8b-q8_0 (closer to fp16 quality, ~2x the bytes per token).
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:8b")
+OLLAMA_TIMEOUT = 60
+# Idle keep-alive connections kept open to the Ollama server between calls
+OLLAMA_MAX_KEEPALIVE = 8
+# Max Ollama requests in flight at once from the async API (size of the dedicated LLM thread pool)
+OLLAMA_MAX_CONNECTIONS = 32
+
+# LLM response cache: identical prompts (same model) are answered from an in-process LRU
+# backed by a sqlite file, so repeated runs on the same prospect skip the network.
+# Set AGENT_LLM_CACHE=0 to bypass it entirely.
+LLM_CACHE_ENABLED = os.getenv("AGENT_LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = os.path.expanduser(os.getenv("AGENT_LLM_CACHE_PATH", "~/.scratch_agent/llm_cache.sqlite"))
+LLM_CACHE_MEMORY_ITEMS = 256
+# Cached entries older than this are ignored and refreshed (0 = keep forever). Calls with temperature > 0 are never cached.
+LLM_CACHE_TTL_SECONDS = float(os.getenv("AGENT_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# Row cap for the sqlite file (oldest entries are purged first; 0 = no cap). Expired rows are purged too.
+LLM_CACHE_MAX_ROWS = int(os.getenv("AGENT_LLM_CACHE_MAX_ROWS", "20000"))
 
 # Backwards-compat alias; not used directly elsewhere
 MODEL_NAME = OLLAMA_MODEL
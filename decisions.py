@@ -5,8 +5,26 @@ This is the single place where the model's text is turned into next_action, tool
 
 import json
 import re
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from orjson import loads as _json_loads  # optional, faster; raises a json.JSONDecodeError subclass
+except ImportError:
+    from json import loads as _json_loads
+
+
+# Compiled once; these run on every Decide/Reflect reply.
+_JSON_DECISION_RE = re.compile(r"\{[^{}]*\"(?:tool_id|next_action|should_stop)[^{}]*\}", re.DOTALL)
+_CONF_RE = re.compile(r"confidence[:\s]+(\d+\.?\d*)")
+# Characters that matter to the JSON scanner; everything between them is skipped in C.
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+_DECISION_KEYS = frozenset(("tool_id", "next_action", "should_stop", "tool_calls"))
+
+
+class DecisionParseError(ValueError):
+    """Raised by parse_decision(strict=True) when the text contains no usable JSON decision."""
 
 
 @dataclass
@@ -19,31 +37,49 @@ class Decision:
     should_stop: bool = False
     should_revise: bool = False
     reasoning: str = ""
+    # Every tool to run this step, in order: [{"tool_id": ..., "tool_input": {...}}]. Independent calls run
+    # concurrently in the Act step. A single tool_id/tool_input is mirrored here as a one-element list.
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
 
 
-def parse_decision(raw: str, structured_fallback: Optional[Dict[str, Any]] = None) -> Decision:
+def parse_decision(
+    raw: str,
+    structured_fallback: Optional[Dict[str, Any]] = None,
+    strict: bool = False,
+) -> Decision:
     """
     Map model output to a Decision. This is where the agent decides what to do next.
     Supports: (1) structured dict from complete_structured, (2) JSON block in text, (3) heuristic parse.
+    With strict=True the heuristic parse is skipped and DecisionParseError is raised instead,
+    so the caller can decide whether a structured (JSON-mode) call is worth paying for.
     """
     if structured_fallback is not None and isinstance(structured_fallback, dict):
         return _decision_from_dict(structured_fallback)
 
-    # Try to find a JSON block in the response
-    json_match = re.search(r"\{[^{}]*\"(?:tool_id|next_action|should_stop)[^{}]*\}", raw, re.DOTALL)
-    if json_match:
+    # Try to find a JSON block in the response (nested objects allowed)
+    data = _extract_top_json(raw)
+    if data is None:
+        # Flat-object regex as a last resort, e.g. when an unmatched "{" in prose precedes the JSON
+        json_match = _JSON_DECISION_RE.search(raw)
+        if json_match:
+            try:
+                data = _json_loads(json_match.group())
+            except json.JSONDecodeError:
+                data = None
+    if isinstance(data, dict):
         try:
-            data = json.loads(json_match.group())
             return _decision_from_dict(data)
-        except (json.JSONDecodeError, TypeError):
+        except (TypeError, ValueError):
             pass
+    if strict:
+        raise DecisionParseError("No JSON decision found in model output.")
 
     # Heuristic: look for explicit phrases
     raw_lower = raw.lower()
     should_stop = "should_stop" in raw_lower or "stop and respond" in raw_lower or "yes" in raw_lower and "stop" in raw_lower
     should_revise = "should_revise" in raw_lower or "revise" in raw_lower
     confidence = 0.5
-    conf_match = re.search(r"confidence[:\s]+(\d+\.?\d*)", raw_lower)
+    conf_match = _CONF_RE.search(raw_lower)
     if conf_match:
         try:
             confidence = float(conf_match.group(1))
@@ -63,19 +99,99 @@ def parse_decision(raw: str, structured_fallback: Optional[Dict[str, Any]] = Non
     )
 
 
+def _iter_top_json(text: str) -> Iterator[str]:
+    """
+    Yield each top-level {...} slice of text, in order, in one pass. Braces inside JSON string
+    literals (with escapes) do not count, so nested tool_input objects and "}" in reasoning are fine.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    escaped_at = -1
+    for m in _JSON_TOKEN_RE.finditer(text):
+        i = m.start()
+        if i == escaped_at:
+            continue
+        ch = text[i]
+        if in_string:
+            if ch == "\\":
+                escaped_at = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == "{":
+            if not depth:
+                start = i
+            depth += 1
+        elif depth:
+            if ch == '"':
+                in_string = True
+            elif ch == "}":
+                depth -= 1
+                if not depth:
+                    yield text[start:i + 1]
+
+
+def _extract_top_json(text: str) -> Optional[Dict[str, Any]]:
+    """Return the first top-level JSON object in text that looks like a decision, or None."""
+    for candidate in _iter_top_json(text):
+        try:
+            data = _json_loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict) and not _DECISION_KEYS.isdisjoint(data):
+            return data
+    return None
+
+
+def _tool_calls_from_list(raw_calls: Any) -> List[Dict[str, Any]]:
+    """Normalize a model-provided tool_calls list to [{"tool_id", "tool_input"}], dropping unusable entries."""
+    calls: List[Dict[str, Any]] = []
+    if not isinstance(raw_calls, list):
+        return calls
+    for item in raw_calls:
+        if not isinstance(item, dict):
+            continue
+        call_id = sys.intern(str(item.get("tool_id") or item.get("tool_name") or "").strip())
+        call_input = item.get("tool_input") or item.get("arguments") or {}
+        if call_id:
+            calls.append({"tool_id": call_id, "tool_input": call_input if isinstance(call_input, dict) else {}})
+    return calls
+
+
+def is_decision_dict(data: Any) -> bool:
+    """True when data is a dict that parse_decision() maps to a real Decision (has a decision key and parses)."""
+    if not isinstance(data, dict) or _DECISION_KEYS.isdisjoint(data):
+        return False
+    try:
+        _decision_from_dict(data)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
 def _decision_from_dict(data: Dict[str, Any]) -> Decision:
     """Build Decision from a dict (e.g. from complete_structured or parsed JSON)."""
     tool_input = data.get("tool_input") or data.get("tool_args") or {}
     if isinstance(tool_input, str):
         tool_input = {"query": tool_input} if "query" in (data.get("parameters") or "") else {"company_key": tool_input}
+    # Interned so the registry lookup matches the (interned) registry key by identity
+    tool_id = sys.intern(str(data.get("tool_id", "")).strip())
+    tool_input = tool_input if isinstance(tool_input, dict) else {}
+    tool_calls = _tool_calls_from_list(data.get("tool_calls"))
+    if tool_calls and not tool_id:
+        # Keep the legacy single-tool fields pointing at the first call
+        tool_id, tool_input = tool_calls[0]["tool_id"], tool_calls[0]["tool_input"]
+    elif tool_id and not tool_calls:
+        tool_calls = [{"tool_id": tool_id, "tool_input": tool_input}]
     return Decision(
         next_action=str(data.get("next_action", "continue")),
-        tool_id=str(data.get("tool_id", "")).strip(),
-        tool_input=tool_input if isinstance(tool_input, dict) else {},
+        tool_id=tool_id,
+        tool_input=tool_input,
         confidence=float(data.get("confidence", 0.5)),
         should_stop=bool(data.get("should_stop", False)),
         should_revise=bool(data.get("should_revise", False)),
         reasoning=str(data.get("reasoning", "")),
+        tool_calls=tool_calls,
     )
 
 
@@ -87,7 +203,7 @@ def parse_reflection(raw: str) -> Dict[str, Any]:
     raw_lower = raw.lower()
     should_revise = "revise" in raw_lower or "should_revise" in raw_lower or "not sufficient" in raw_lower
     confidence = 0.5
-    conf_match = re.search(r"confidence[:\s]+(\d+\.?\d*)", raw_lower)
+    conf_match = _CONF_RE.search(raw_lower)
     if conf_match:
         try:
             confidence = float(conf_match.group(1))
@@ -96,3 +212,30 @@ def parse_reflection(raw: str) -> Dict[str, Any]:
         except ValueError:
             pass
     return {"confidence": confidence, "should_revise": should_revise, "critique": raw.strip()}
+
+
+def parse_fused_step(data: Dict[str, Any]) -> Optional[Tuple[str, Decision, Dict[str, Any]]]:
+    """
+    Parse the combined Reason + Decide + Reflect reply: {"reasoning", "decision": {...}, "reflection": {...}}.
+    Returns (reasoning, Decision, reflection dict), or None when the reply is unusable
+    (the caller then runs the three steps separately).
+    """
+    decision_data = data.get("decision") if isinstance(data, dict) else None
+    if not isinstance(decision_data, dict):
+        return None
+    try:
+        decision = _decision_from_dict(decision_data)
+        reflection_data = data.get("reflection")
+        if not isinstance(reflection_data, dict):
+            reflection_data = {}
+        confidence = float(reflection_data.get("confidence", decision.confidence))
+    except (TypeError, ValueError):
+        return None
+    if confidence > 1:
+        confidence /= 100.0
+    reflection = {
+        "confidence": confidence,
+        "should_revise": bool(reflection_data.get("should_revise", False)),
+        "critique": str(reflection_data.get("critique", "")).strip(),
+    }
+    return str(data.get("reasoning", "")), decision, reflection
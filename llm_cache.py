@@ -0,0 +1,183 @@
+"""
+Content-addressed cache for LLM completions.
+Prompts repeat across retries, revise iterations, and repeated runs on the same prospect;
+a hit skips the Ollama round-trip entirely. Entries live in an in-process LRU dict backed by sqlite on disk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import LLM_CACHE_ENABLED, LLM_CACHE_MAX_ROWS, LLM_CACHE_MEMORY_ITEMS, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
+
+
+class LLMCache:
+    """
+    Two-level prompt cache: a bounded in-process LRU in front of a sqlite table.
+    The sqlite file is opened lazily on first use; if it cannot be opened, the cache
+    keeps working in memory only. Entries older than ttl_seconds (0 = never) count as misses and are
+    purged from disk, which also keeps at most max_rows rows (oldest dropped first).
+    """
+
+    # The sqlite table is pruned (expired rows, then the oldest beyond max_rows) on open and every this many sets
+    PRUNE_EVERY = 256
+
+    def __init__(
+        self, path: Optional[str], max_memory_items: int = 256, ttl_seconds: float = 0, max_rows: int = 0
+    ) -> None:
+        self._path = path
+        self._mem: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._max_memory_items = max_memory_items
+        self._ttl = ttl_seconds
+        self._max_rows = max_rows
+        self._sets = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, mode: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Hash model, call mode ("generate"/"json"), prompt and sampling options into a fixed-size key."""
+        payload = json.dumps(
+            {"model": model, "mode": mode, "prompt": prompt, "options": options or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Open the sqlite store on first use. Called with the lock held."""
+        if self._conn is None and self._path:
+            try:
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self._path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_responses "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_created ON llm_responses (created)")
+                conn.commit()
+                self._conn = conn
+                self._prune(conn)
+            except (OSError, sqlite3.Error):
+                self._path = None
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Delete expired rows, then the oldest rows beyond max_rows (0 = no cap). Called with the lock held."""
+        try:
+            if self._ttl:
+                conn.execute("DELETE FROM llm_responses WHERE created < ?", (time.time() - self._ttl,))
+            if self._max_rows:
+                conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN "
+                    "(SELECT key FROM llm_responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                    (self._max_rows,),
+                )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _fresh(self, created: float) -> bool:
+        return not self._ttl or time.time() - created < self._ttl
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        """Insert into the in-process LRU. Called with the lock held."""
+        self._mem[key] = (value, created)
+        self._mem.move_to_end(key)
+        if len(self._mem) > self._max_memory_items:
+            self._mem.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """Memory first, then disk. Called with the lock held."""
+        entry = self._mem.get(key)
+        if entry is not None:
+            if self._fresh(entry[1]):
+                self._mem.move_to_end(key)
+                return entry[0]
+            del self._mem[key]
+        conn = self._db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value, created FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or not self._fresh(row[1]):
+            return None
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss (or an expired entry)."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store value under key in memory and on disk (the disk table is pruned every PRUNE_EVERY sets)."""
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, value, created) VALUES (?, ?, ?)",
+                    (key, value, created),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                return
+            self._sets += 1
+            if self._sets % self.PRUNE_EVERY == 0:
+                self._prune(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters since process start (or the last clear())."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_items": len(self._mem)}
+
+    def clear(self) -> None:
+        """Drop every entry (memory and disk) and reset the counters."""
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.misses = 0
+            conn = self._db()
+            if conn is not None:
+                try:
+                    conn.execute("DELETE FROM llm_responses")
+                    conn.commit()
+                except sqlite3.Error:
+                    pass
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache, or None when disabled via AGENT_LLM_CACHE=0."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    LLM_CACHE_PATH,
+                    max_memory_items=LLM_CACHE_MEMORY_ITEMS,
+                    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                    max_rows=LLM_CACHE_MAX_ROWS,
+                )
+    return _cache
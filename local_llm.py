@@ -3,12 +3,40 @@ Local LLM client for the scratch agent using Ollama.
 All planning, reasoning, and tool-selection decisions happen through this interface.
 """
 
+import asyncio
+import contextvars
+import functools
+import http.client
 import json
-import urllib.error
-import urllib.request
-from typing import Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
 
-from config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from config import (
+    MODEL_ERROR_RETRIES,
+    OLLAMA_BASE_URL,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_MAX_KEEPALIVE,
+    OLLAMA_MODEL,
+    OLLAMA_TIMEOUT,
+)
+from llm_cache import get_cache
+
+# orjson (optional) encodes/decodes the request body and every streamed line several times faster.
+# Its JSONDecodeError subclasses json.JSONDecodeError, so the except clauses below cover both.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_bytes: Callable[[Any], bytes] = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+T = TypeVar("T")
 
 
 def _ollama_url(path: str) -> str:
@@ -17,29 +45,109 @@ def _ollama_url(path: str) -> str:
     return f"{base}{path}"
 
 
+class _ConnectionPool:
+    """
+    Keep-alive HTTP connections to the Ollama server, reused across calls.
+    Each connection is used by one thread at a time; idle ones are parked here
+    so the next call skips the TCP (and TLS) handshake.
+    """
+
+    def __init__(self, base_url: str, max_idle: int, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port
+        self._base_path = parts.path.rstrip("/")
+        self._max_idle = max_idle
+        self._timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def path(self, path: str) -> str:
+        """Request path on the server, including any path prefix from OLLAMA_BASE_URL."""
+        return f"{self._base_path}{path}"
+
+    def acquire(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return conn_cls(self._host, self._port, timeout=self._timeout)
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+_POOL = _ConnectionPool(OLLAMA_BASE_URL, max_idle=OLLAMA_MAX_KEEPALIVE, timeout=OLLAMA_TIMEOUT)
+# Request path and headers are the same for every call; build them once
+_GENERATE_PATH = _POOL.path("/api/generate")
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# Errors a reused keep-alive socket raises when the server already closed it
+_STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+def _send_generate(body: dict) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+    """
+    POST a JSON body to Ollama's /api/generate on a pooled keep-alive connection.
+    Connection-level failures are retried here (MODEL_ERROR_RETRIES) on a fresh socket,
+    without re-running any prompt building in the caller. A pooled socket found dead on reuse
+    is replaced without spending a retry. Returns (connection, response)
+    with the body unread; hand both to _release when done.
+    """
+    data = _json_bytes(body)
+    last_err: Optional[Exception] = None
+    attempts = MODEL_ERROR_RETRIES + 1
+    while attempts > 0:
+        conn = _POOL.acquire()
+        # A pooled socket may have been closed by the server while idle (keep-alive timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request("POST", _GENERATE_PATH, body=data, headers=_JSON_HEADERS)
+            return conn, conn.getresponse()
+        except _STALE_ERRORS as e:
+            conn.close()
+            last_err = e
+            if not reused:
+                attempts -= 1
+            # else: stale keep-alive socket, reconnect without spending a retry
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            last_err = e
+            attempts -= 1
+    raise RuntimeError(f"Ollama connection error ({_ollama_url('/api/generate')}): {last_err}") from last_err
+
+
+def _release(conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+    """Return the connection to the pool if the response was fully read and the server keeps it alive."""
+    if resp.isclosed() and not resp.will_close:
+        _POOL.release(conn)
+    else:
+        conn.close()
+
+
 def _post_generate(body: dict) -> dict:
     """
     Call Ollama's /api/generate endpoint with a JSON body and return the parsed JSON response.
-    Uses non-streaming mode (stream: false).
-    """
-    data = json.dumps(body).encode("utf-8")
-    req = urllib.request.Request(
-        _ollama_url("/api/generate"),
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    Uses non-streaming mode (stream: false). HTTP errors are not retried.
+    """
+    conn, resp = _send_generate(body)
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            raw = resp.read().decode("utf-8", errors="ignore")
-    except urllib.error.HTTPError as e:
-        err_body = e.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"Ollama HTTP {e.code}: {err_body}") from e
-    except urllib.error.URLError as e:
-        raise RuntimeError(f"Ollama connection error: {e}") from e
+        raw = resp.read().decode("utf-8", errors="ignore")
+    except (OSError, http.client.HTTPException) as e:
+        conn.close()
+        raise RuntimeError(f"Ollama connection error ({_ollama_url('/api/generate')}): {e}") from e
+    _release(conn, resp)
+    if resp.status >= 400:
+        raise RuntimeError(f"Ollama HTTP {resp.status}: {raw}")
 
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except json.JSONDecodeError as e:
         raise RuntimeError(f"Ollama returned non-JSON response: {raw[:200]}") from e
 
@@ -48,8 +156,10 @@ def complete(prompt: str, **kwargs: Any) -> str:
     """
     Send a prompt to the local LLM (Ollama) and return the raw text response.
     This is the single call site for reasoning, decision, and reflection.
+    Responses are served from the prompt cache when possible (keyed by model, prompt and options);
+    calls that explicitly ask for sampling (temperature > 0) always go to the model.
     """
-    options = kwargs.get("options") or {}
+    options = dict(kwargs.get("options") or {})
     temperature = kwargs.get("temperature")
     if temperature is not None:
         # do not overwrite if user already provided in options
@@ -63,35 +173,276 @@ def complete(prompt: str, **kwargs: Any) -> str:
     if options:
         body["options"] = options
 
+    cache = get_cache() if float(options.get("temperature") or 0) <= 0 else None
+    key = cache.make_key(OLLAMA_MODEL, "generate", prompt, options) if cache else ""
+    if cache:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
     resp = _post_generate(body)
     # Non-streaming generate returns a single object with a `response` field
-    return str(resp.get("response", ""))
+    text = str(resp.get("response", ""))
+    if cache and text:
+        cache.set(key, text)
+    return text
 
 
-def complete_structured(prompt: str, schema: Optional[dict] = None) -> dict:
+def cached_completion(prompt: str) -> Optional[str]:
+    """The answer complete(prompt) (default options) would get from the prompt cache, or None on a miss."""
+    cache = get_cache()
+    return cache.get(cache.make_key(OLLAMA_MODEL, "generate", prompt, {})) if cache else None
+
+
+def cache_completion(prompt: str, text: str) -> None:
+    """
+    Store text as the cached answer to complete(prompt) (default options), for answers obtained another way
+    (e.g. split out of a combined request), so later plain calls with that prompt hit the cache.
+    """
+    cache = get_cache()
+    if cache and text:
+        cache.set(cache.make_key(OLLAMA_MODEL, "generate", prompt, {}), text)
+
+
+class JsonObjectScanner:
+    """
+    Incremental brace matcher for streamed JSON text. Tracks nesting depth outside of string
+    literals (escapes included), so braces inside values like "reasoning" do not count.
+    feed() returns True when a top-level {...} object has just closed; `end` is the offset
+    just past its closing brace in the text fed so far.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.end = -1
+        self._offset = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> bool:
+        closed = False
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                # Strings only matter inside an object; prose before it may contain stray quotes
+                self._in_string = self.depth > 0
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    self.end = self._offset + i + 1
+                    closed = True
+        self._offset += len(chunk)
+        return closed
+
+
+def _iter_generate(body: dict, parts: List[str]) -> Generator[str, None, bool]:
+    """
+    Stream /api/generate (NDJSON, stream: true), yielding each response chunk and appending it to parts.
+    Returns True when the server reported done. Closing the generator early (or a failure) drops
+    the socket, which makes Ollama stop generating; a finished stream returns it to the pool.
+    """
+    conn, resp = _send_generate(body)
+    done = False
+    try:
+        if resp.status >= 400:
+            raise RuntimeError(f"Ollama HTTP {resp.status}: {resp.read().decode('utf-8', errors='ignore')}")
+        for line in resp:
+            if not line.strip():
+                continue
+            try:
+                chunk = _json_loads(line)
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"Ollama returned non-JSON stream line: {line[:200]!r}") from e
+            if chunk.get("error"):
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            text = str(chunk.get("response", ""))
+            if text:
+                parts.append(text)
+                yield text
+            if chunk.get("done"):
+                done = True
+                break
+        if done:
+            resp.read()
+    except (OSError, http.client.HTTPException) as e:
+        raise RuntimeError(f"Ollama connection error ({_ollama_url('/api/generate')}): {e}") from e
+    finally:
+        if done:
+            _release(conn, resp)
+        else:
+            # Stopped early (or failed): drop the socket so the server cancels generation.
+            conn.close()
+    return done
+
+
+def stream_complete(prompt: str) -> Iterator[str]:
+    """
+    Stream the response text chunk by chunk (Ollama NDJSON, stream: true).
+    The caller can stop as soon as it has what it needs: closing the generator early
+    (break, or .close()) closes the connection, which makes Ollama stop generating.
+    Only fully streamed responses are stored in the prompt cache (shared with complete()).
+    """
+    cache = get_cache()
+    key = cache.make_key(OLLAMA_MODEL, "generate", prompt) if cache else ""
+    hit = cache.get(key) if cache else None
+    if hit is not None:
+        yield hit
+        return
+
+    body: dict[str, Any] = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": True,
+    }
+    parts: List[str] = []
+    done = yield from _iter_generate(body, parts)
+    if done and cache and parts:
+        cache.set(key, "".join(parts))
+
+
+def complete_structured(
+    prompt: str,
+    schema: Optional[dict] = None,
+    accept: Optional[Callable[[dict], bool]] = None,
+    use_cache: bool = True,
+) -> dict:
     """
     Request a structured JSON response from Ollama.
 
     - Sends `format: \"json\"` so Ollama validates JSON.
     - Expects the model to return a JSON object in `response`.
+    - Streams the reply and stops generation as soon as the top-level object closes,
+      so trailing whitespace/chatter after the JSON is never decoded.
     - If parsing fails, returns an empty dict; callers fall back to text parsing.
+    - The raw JSON text is cached by prompt, like complete(), but only when a complete object was parsed
+      and `accept(parsed)` (if given) approves it, so replies the caller cannot use are never replayed.
+      use_cache=False bypasses the cache (e.g. for context-free retry prompts).
     """
     body: dict[str, Any] = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
-        "stream": False,
+        "stream": True,
         "format": "json",
     }
     # `schema` can be used in the prompt; we don't send it separately here
     _ = schema
 
-    resp = _post_generate(body)
-    text = str(resp.get("response", "")).strip()
+    cache = get_cache() if use_cache else None
+    key = cache.make_key(OLLAMA_MODEL, "json", prompt) if cache else ""
+    text = cache.get(key) if cache else None
+    store = False
+    if text is None:
+        parts: List[str] = []
+        scanner = JsonObjectScanner()
+        stream = _iter_generate(body, parts)
+        try:
+            for chunk in stream:
+                if scanner.feed(chunk):
+                    break
+        finally:
+            stream.close()
+        text = "".join(parts)
+        # A stream that ended before the object closed (e.g. num_predict hit) is truncated
+        store = scanner.end >= 0
+        text = (text[:scanner.end] if store else text).strip()
     if not text:
         return {}
     try:
-        parsed = json.loads(text)
-        return parsed if isinstance(parsed, dict) else {}
+        parsed = _json_loads(text)
     except json.JSONDecodeError:
         return {}
+    if not isinstance(parsed, dict):
+        return {}
+    # Only a complete, parsed object is cached; a truncated reply would be replayed for the whole TTL
+    if cache and store and (accept is None or accept(parsed)):
+        cache.set(key, text)
+    return parsed
+
+
+def complete_fused(
+    context: str,
+    reason_prompt: str,
+    decide_prompt: str,
+    reflect_prompt: str,
+    accept: Optional[Callable[[dict], bool]] = None,
+) -> dict:
+    """
+    Reason, Decide and Reflect in one structured request: the shared context is sent (and prefilled) once
+    and the model answers with a single JSON object {"reasoning", "decision", "reflection"}.
+    Each *_prompt describes what goes in its section. Returns the parsed dict ({} if unusable).
+    `accept` is passed to complete_structured (only replies it approves are cached).
+    """
+    prompt = (
+        f"{context}\n\n"
+        "Answer with one JSON object with three keys. "
+        f"reasoning: {reason_prompt} "
+        f"decision: {decide_prompt} "
+        f"reflection: {reflect_prompt}"
+    )
+    return complete_structured(prompt, schema={"required": ["reasoning", "decision", "reflection"]}, accept=accept)
+
+
+# Dedicated worker threads for blocking Ollama calls. asyncio's default executor is capped at
+# min(32, cpu_count + 4), which on small machines throttles concurrent agent runs well below
+# what the server can batch; this pool is sized to OLLAMA_MAX_CONNECTIONS instead.
+_LLM_EXECUTOR = ThreadPoolExecutor(max_workers=OLLAMA_MAX_CONNECTIONS, thread_name_prefix="ollama")
+
+
+async def arun_llm_call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking LLM call (complete, stream consumer, ...) on the LLM thread pool and await it.
+    The caller's context variables (e.g. the run id used for log routing) are carried over, like asyncio.to_thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_LLM_EXECUTOR, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+async def acomplete(prompt: str, **kwargs: Any) -> str:
+    """
+    Async twin of complete() with the same signature.
+    The blocking HTTP call runs on the LLM thread pool so several prompts can be in flight at once.
+    """
+    return await arun_llm_call(complete, prompt, **kwargs)
+
+
+async def acomplete_structured(
+    prompt: str,
+    schema: Optional[dict] = None,
+    accept: Optional[Callable[[dict], bool]] = None,
+    use_cache: bool = True,
+) -> dict:
+    """Async twin of complete_structured() with the same signature."""
+    return await arun_llm_call(complete_structured, prompt, schema, accept, use_cache)
+
+
+async def acomplete_fused(
+    context: str,
+    reason_prompt: str,
+    decide_prompt: str,
+    reflect_prompt: str,
+    accept: Optional[Callable[[dict], bool]] = None,
+) -> dict:
+    """Async twin of complete_fused() with the same signature."""
+    return await arun_llm_call(complete_fused, context, reason_prompt, decide_prompt, reflect_prompt, accept)
+
+
+def complete_batch(prompts: List[str], **kwargs: Any) -> List[str]:
+    """
+    complete() for several independent prompts at once: the requests are fanned out over the LLM
+    thread pool and the shared keep-alive connections, so Ollama can batch them on the GPU
+    (up to its OLLAMA_NUM_PARALLEL). Results are in prompt order; the first failure is raised.
+    Do not call from inside the LLM thread pool itself (the calls would queue behind the caller).
+    """
+    if len(prompts) <= 1:
+        return [complete(p, **kwargs) for p in prompts]
+    return list(_LLM_EXECUTOR.map(functools.partial(complete, **kwargs), prompts))
 
@@ -3,7 +3,60 @@ Simple memory store for the scratch agent.
 Facts, observations, and tool results are stored here and injected into the decision step.
 """
 
-from typing import List, Optional
+import hashlib
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from decisions import Decision
+
+
+def _tail(items: Deque[Any], k: int) -> List[Any]:
+    """Last k items of a deque without copying the whole thing (deques cannot be sliced)."""
+    if k >= len(items):
+        return list(items)
+    return list(islice(items, len(items) - k, None))
+
+
+def _append_unique(values: List[str], value: str, limit: int) -> None:
+    if value and value not in values:
+        values.append(value)
+        del values[:-limit]
+
+
+@dataclass
+class StructuredState:
+    """
+    Fixed-schema summary of the run so far, updated after every step.
+    Serialized deterministically (same field order, same formatting) so the block is cheap
+    for the model to read and byte-stable between steps when nothing changed.
+    """
+    step: int = 0
+    confidence: float = 0.0
+    tools_used: List[str] = field(default_factory=list)
+    queries_run: List[str] = field(default_factory=list)
+    key_decisions: List[str] = field(default_factory=list)
+    failed_actions: List[str] = field(default_factory=list)
+    open_questions: str = ""
+    last_observation: str = ""
+
+    MAX_LIST = 10
+
+    def to_text(self) -> str:
+        """Render as `key: value` lines in field order; lists joined with '; '."""
+        return "\n".join([
+            f"step: {self.step}",
+            f"confidence: {self.confidence:.2f}",
+            f"tools_used: {'; '.join(self.tools_used) or '-'}",
+            f"queries_run: {'; '.join(self.queries_run) or '-'}",
+            f"key_decisions: {'; '.join(self.key_decisions) or '-'}",
+            f"failed_actions: {'; '.join(self.failed_actions) or '-'}",
+            f"open_questions: {self.open_questions or '-'}",
+            f"last_observation: {self.last_observation or '-'}",
+        ])
 
 
 class AgentMemory:
@@ -12,48 +65,136 @@ class AgentMemory:
     The agent loop reads from this when building context for Reason/Decide
     and updates it after each Act/Observe so memory influences decisions.
     Saved notes are explicit facts the model chose to save for the next step (reduces hallucination).
+    Every entry gets a stable, monotonically increasing id, and every mutation bumps `version`.
     """
 
-    def __init__(self, max_items: int = 100, max_saved_notes: int = 50) -> None:
-        self._items: List[str] = []
-        self._max_items = max_items
-        self._saved_notes: List[str] = []
+    def __init__(self, max_saved_notes: int = 50) -> None:
+        # Bounded ring buffer: appends are O(1) and drop the oldest note once full
+        self._saved_notes: Deque[Tuple[int, str, bytes]] = deque(maxlen=max_saved_notes)
         self._max_saved_notes = max_saved_notes
+        # Dedupe keys of the notes currently in _saved_notes (a key leaves with its evicted note)
+        self._note_keys: Set[bytes] = set()
+        # Pack lines ("- [id] text") rendered once at insert time, parallel to _saved_notes
+        self._note_lines: Deque[str] = deque(maxlen=max_saved_notes)
+        # Rendered pack strings, valid while _version is unchanged
+        self._render_cache: Dict[Tuple[Any, ...], str] = {}
+        self._render_version = -1
+        self._next_id = 1
+        self._version = 0
+        self.state = StructuredState()
+        # Tools (save_note) run on pool threads, possibly several at once, so mutations and renders are serialized
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Incremented on every add_saved_note / update_structured / clear, so callers can tell when the pack changed."""
+        return self._version
 
-    def add(self, entry: str) -> None:
-        """Append one observation or fact. Used after each tool result or key finding."""
-        self._items.append(entry)
-        if len(self._items) > self._max_items:
-            self._items = self._items[-self._max_items :]
+    def _new_id(self) -> int:
+        entry_id = self._next_id
+        self._next_id += 1
+        self._version += 1
+        return entry_id
 
-    def add_saved_note(self, note: str) -> None:
-        """Save a note the model explicitly chose to keep for later steps. Shown in context."""
+    def add_saved_note(self, note: str) -> bool:
+        """
+        Save a note the model explicitly chose to keep for later steps. Shown in context.
+        A repeat of a note still held (same text up to case and whitespace) is not stored again, so it does
+        not grow the prompt on every later step. Returns False for an empty or repeated note.
+        """
         note = (note or "").strip()
         if not note:
-            return
-        self._saved_notes.append(note)
-        if len(self._saved_notes) > self._max_saved_notes:
-            self._saved_notes = self._saved_notes[-self._max_saved_notes :]
-
-    def get_recent(self, k: int = 10) -> List[str]:
-        """Return the last k entries for inclusion in the prompt."""
-        return self._items[-k:] if self._items else []
-
-    def get_summary(self, max_chars: int = 2000) -> str:
-        """Return a single string of recent memory for context (e.g. last entries joined)."""
-        parts = []
-        if self._saved_notes:
-            notes_str = "\n".join(f"- {n}" for n in self._saved_notes[-20:])
-            parts.append("Saved notes (use these; do not re-invent):\n" + notes_str)
-        recent = self.get_recent(50)
-        if recent:
-            parts.append("Step log:\n" + "\n".join(recent))
-        lines = "\n\n".join(parts)
-        if len(lines) > max_chars:
-            lines = "..." + lines[-max_chars:]
-        return lines if lines else "(no memory yet)"
+            return False
+        key = hashlib.blake2b(" ".join(note.casefold().split()).encode("utf-8"), digest_size=8).digest()
+        with self._lock:
+            if key in self._note_keys:
+                return False
+            if len(self._saved_notes) == self._max_saved_notes:
+                self._note_keys.discard(self._saved_notes[0][2])
+            note_id = self._new_id()
+            self._saved_notes.append((note_id, note, key))
+            self._note_lines.append(f"- [{note_id}] {note}")
+            self._note_keys.add(key)
+        return True
+
+    def update_structured(self, decision: "Decision", observation: str, reflection: Dict[str, Any]) -> None:
+        """
+        Fold one finished step into the structured state (no LLM call; purely deterministic).
+        Replaces the free-text per-step log entry in the agent loop.
+        """
+        with self._lock:
+            st = self.state
+            st.step += 1
+            st.confidence = float(reflection.get("confidence", decision.confidence))
+            step_calls = [(tc["tool_id"], tc["tool_input"]) for tc in decision.tool_calls]
+            if not step_calls and decision.tool_id:
+                step_calls = [(decision.tool_id, decision.tool_input)]
+            calls = []
+            for call_id, call_input in step_calls:
+                if call_id == "batch":
+                    # Model-provided; anything but a list (e.g. a number) counts as no invocations
+                    invocations = call_input.get("invocations")
+                    calls.extend(
+                        (str(inv.get("tool_name") or inv.get("tool_id") or ""), inv.get("arguments") or {})
+                        for inv in (invocations if isinstance(invocations, list) else [])
+                        if isinstance(inv, dict)
+                    )
+                else:
+                    calls.append((call_id, call_input))
+            for call_id, call_input in calls:
+                _append_unique(st.tools_used, call_id, StructuredState.MAX_LIST)
+                if call_id == "search_web" and isinstance(call_input, dict):
+                    _append_unique(st.queries_run, str(call_input.get("query") or "").strip(), StructuredState.MAX_LIST)
+            step_ids = ",".join(call_id for call_id, _ in step_calls)
+            st.key_decisions.append(f"{st.step}: {decision.next_action}" + (f" ({step_ids})" if step_ids else ""))
+            del st.key_decisions[:-StructuredState.MAX_LIST]
+            for line in observation.split("\n"):
+                if any(line.startswith(f"Tool {call_id} failed") for call_id, _ in step_calls):
+                    st.failed_actions.append(f"{st.step}: {line[:150]}")
+            del st.failed_actions[:-StructuredState.MAX_LIST]
+            st.open_questions = str(reflection.get("critique", ""))[:300].replace("\n", " ").strip()
+            st.last_observation = observation[:150].replace("\n", " ")
+            self._version += 1
+
+    def _cached(self, key: Tuple[Any, ...], build: Callable[[], str]) -> str:
+        """Return the rendering for key, rebuilding only if memory changed since it was last built."""
+        if self._render_version != self._version:
+            self._render_cache.clear()
+            self._render_version = self._version
+        text = self._render_cache.get(key)
+        if text is None:
+            text = self._render_cache[key] = build()
+        return text
+
+    def get_pack(self, max_notes: int = 20) -> str:
+        """
+        Return memory as a deterministic pack for the prompt: a fixed `memory_pack` header, then saved notes
+        in id order with fixed bullets, then the structured state. Notes are never truncated mid-string and
+        new ones are only appended, so the text up to the structured state (which changes every step) stays
+        byte-identical until a note is added or, past max_notes, the oldest shown note drops out.
+        The version is kept out of the text; compare `version` to tell whether the pack changed.
+        The rendered pack is reused until the next mutation.
+        """
+        with self._lock:
+            return self._cached(("pack", max_notes), lambda: self._build_pack(max_notes))
+
+    def _build_pack(self, max_notes: int) -> str:
+        lines = ["memory_pack"]
+        if self._note_lines:
+            lines.append("Saved notes (use these; do not re-invent):")
+            lines.extend(_tail(self._note_lines, max_notes))
+        if self.state.step:
+            lines.append("Structured state:")
+            lines.append(self.state.to_text())
+        if len(lines) == 1:
+            lines.append("(no memory yet)")
+        return "\n".join(lines)
 
     def clear(self) -> None:
         """Reset memory (e.g. for a new task)."""
-        self._items.clear()
-        self._saved_notes.clear()
+        with self._lock:
+            self._saved_notes.clear()
+            self._note_lines.clear()
+            self._note_keys.clear()
+            self.state = StructuredState()
+            self._version += 1
@@ -4,24 +4,89 @@ Tools are chosen by the model in the Decide step; the loop runs registry[tool_id
 No mock data: extract_insights uses the LLM over the provided profile text.
 search_web uses DuckDuckGo (free, no API key) to fetch external knowledge.
 save_note lets the model persist a fact for the next step (reduces hallucination).
+batch lets the model run several independent tools in one step; they execute concurrently.
 """
 
-from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+import asyncio
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from config import BATCH_MAX_CONCURRENCY, EXTRACT_COALESCE_WINDOW_SECONDS
+from local_llm import cache_completion, cached_completion, complete_batch as _llm_complete_batch
+
+try:
+    from ddgs import DDGS
+    from ddgs.exceptions import DDGSException, TimeoutException as DDGSTimeoutException
+    _DDGS_AVAILABLE = True
+except ImportError:  # search_web reports how to install it instead
+    DDGS = None
+    DDGSException = DDGSTimeoutException = Exception
+    _DDGS_AVAILABLE = False
 
 if TYPE_CHECKING:
     from memory import AgentMemory
 
 # Default number of search results to return (keeps context size manageable)
 DEFAULT_SEARCH_MAX_RESULTS = 5
+# Upper bound on a model-requested max_results (values are clamped to 1..this)
+SEARCH_MAX_RESULTS_LIMIT = 20
+# Upper bound on invocations run by one batch call
+BATCH_MAX_INVOCATIONS = 8
+# Worker threads shared by run_tools (and so by every batch call)
+TOOL_MAX_WORKERS = 16
+# Tools that are safe to run speculatively (no side effects; result depends only on the arguments)
+PREFETCHABLE_TOOLS = frozenset({"search_web", "extract_insights"})
+# Max prefetched results waiting to be claimed by run_tool; the oldest unclaimed one is dropped beyond this
+PREFETCH_MAX_PENDING = 32
+# Formatted search_web results are reused for this long (seconds), for up to this many distinct queries
+SEARCH_CACHE_TTL_SECONDS = 600.0
+SEARCH_CACHE_MAX_ENTRIES = 256
 
 # Tool shape: id, description, parameters (schema), fn
 ToolSpec = Dict[str, Any]
 
-EXTRACT_INSIGHTS_PROMPT = (
+# The profile goes last, so prompts are built as prefix + text (no template parsing per call)
+_EXTRACT_PREFIX = (
     "From this company profile, extract key facts, pain points, opportunities, and differentiators. "
     "Return a concise bullet list. Do not invent information; only summarize what is in the profile.\n\n"
-    "Profile:\n{profile_text}"
+    "Profile:\n"
+)
+EXTRACT_INSIGHTS_PROMPT = _EXTRACT_PREFIX + "{profile_text}"
+# Same task over several profiles in one request; each answer starts with its profile's header line
+_EXTRACT_MULTI_PREFIX = (
+    "From each company profile below, extract key facts, pain points, opportunities, and differentiators. "
+    "Return a concise bullet list per profile. Do not invent information; only summarize what is in that profile. "
+    "Answer every profile in order, starting each answer with its header line exactly as given (e.g. --- profile 1 ---).\n\n"
 )
+_PROFILE_HEADER_RE = re.compile(r"^\W*-{3}\s*profile\s+(\d+)\s*-{3}\W*$", re.IGNORECASE | re.MULTILINE)
+
+
+# One formatted search result: index, title, URL, snippet (bound once; no per-result f-string setup)
+_RESULT_TMPL = "[{}] {}\nURL: {}\n{}".format
+
+# (normalized query, max_results) -> (time.monotonic() when fetched, formatted result), oldest first.
+# Shared across registries and threads (batch runs searches concurrently), hence the lock.
+_SEARCH_CACHE: "OrderedDict[Tuple[str, int], Tuple[float, str]]" = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+# One DDGS client per thread, created on that thread's first search, so its HTTP session (and pooled
+# TCP/TLS connections) is reused across steps and runs. Searches run concurrently on the tool pool and
+# DDGS is not thread-safe, so a client is never shared. Dropped after a transport failure (see search_web).
+_DDGS_LOCAL = threading.local()
+
+
+def _ddgs_client() -> Any:
+    client = getattr(_DDGS_LOCAL, "client", None)
+    if client is None:
+        client = _DDGS_LOCAL.client = DDGS()
+    return client
 
 
 def search_web(query: str, max_results: Optional[int] = None) -> str:
@@ -29,68 +94,324 @@ def search_web(query: str, max_results: Optional[int] = None) -> str:
     Search the web via DuckDuckGo (free, no API key). Returns title, URL, and snippet for each result.
     Use this to look up company info, industry trends, or supporting evidence not in the profile.
     """
-    max_results = max_results if max_results is not None else DEFAULT_SEARCH_MAX_RESULTS
+    # Model-provided; may arrive as a string like "5". A bad value is a tool error, not a client failure.
+    try:
+        max_results = int(max_results) if max_results is not None else DEFAULT_SEARCH_MAX_RESULTS
+    except (TypeError, ValueError):
+        return f"Invalid max_results {max_results!r}; pass a whole number (default {DEFAULT_SEARCH_MAX_RESULTS})."
+    max_results = min(max(max_results, 1), SEARCH_MAX_RESULTS_LIMIT)
     query = (query or "").strip()
     if not query:
         return "No search query provided. Pass a non-empty 'query' string."
-    try:
-        from ddgs import DDGS
-    except ImportError:
+    key = (query.lower(), max_results)
+    with _SEARCH_CACHE_LOCK:
+        hit = _SEARCH_CACHE.get(key)
+        if hit is not None and time.monotonic() - hit[0] < SEARCH_CACHE_TTL_SECONDS:
+            _SEARCH_CACHE.move_to_end(key)
+            return hit[1]
+    if not _DDGS_AVAILABLE:
         return "Search unavailable: install with 'pip install ddgs'."
     try:
-        ddgs = DDGS()
-        results = list(ddgs.text(query, max_results=max_results))
+        ddgs = _ddgs_client()
+        # Take at most max_results even if the client yields lazily (stops before fetching another page)
+        results = list(islice(ddgs.text(query, max_results=max_results), max_results))
     except Exception as e:
+        # ddgs reports "no results" and rate limits as DDGSException; only a timeout or an error from
+        # outside ddgs points at a broken session, so only then does this thread start a fresh client
+        if isinstance(e, DDGSTimeoutException) or not isinstance(e, DDGSException):
+            _DDGS_LOCAL.client = None
         return f"Search failed: {e}"
     if not results:
         return "No results found for that query."
-    parts = []
-    for i, r in enumerate(results, 1):
-        title = r.get("title") or ""
-        href = r.get("href") or ""
-        body = r.get("body") or ""
-        parts.append(f"[{i}] {title}\nURL: {href}\n{body}")
-    return "\n\n".join(parts)
+    text = "\n\n".join([
+        _RESULT_TMPL(i, r.get("title") or "", r.get("href") or "", r.get("body") or "")
+        for i, r in enumerate(results, 1)
+    ])
+    # Only successful, non-empty searches are cached; failures and misses are retried next time
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic(), text)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > SEARCH_CACHE_MAX_ENTRIES:
+            _SEARCH_CACHE.popitem(last=False)
+    return text
+
+
+# Only this much of a profile is sent to the LLM by extract_insights
+EXTRACT_MAX_CHARS = 8000
+# Opt-in (config EXTRACT_COALESCE_WINDOW_SECONDS > 0): a run's extract_insights calls arriving within this
+# window of each other (batch invocations, parallel tool_calls) are answered together, up to
+# EXTRACT_COALESCE_MAX short profiles per combined request
+EXTRACT_COALESCE_MAX = 4
+
+
+def _split_multi_reply(reply: str, n: int) -> List[Optional[str]]:
+    """Answers of a combined extraction reply by profile number; None where a profile's answer is missing."""
+    out: List[Optional[str]] = [None] * n
+    headers = list(_PROFILE_HEADER_RE.finditer(reply))
+    for m, nxt in zip(headers, headers[1:] + [None]):
+        i = int(m.group(1)) - 1
+        body = reply[m.end():nxt.start() if nxt else len(reply)].strip()
+        if 0 <= i < n and body:
+            out[i] = body
+    return out
+
+
+class _RunExtractor:
+    """
+    Per-registry (i.e. per-run) extraction state: the answers cache and the coalescing of concurrent calls.
+    Nothing is shared between runs, so one prospect's profile never ends up in another run's prompt.
+    Identical texts in flight share one answer. When `window` > 0 (opt-in, EXTRACT_COALESCE_WINDOW_SECONDS),
+    the first caller of a group waits up to `window` seconds (less if the group fills) for other calls of the
+    same run, then sends them together: short profiles are packed into combined prompts of at most
+    EXTRACT_MAX_CHARS profile text, longer ones go alone, and all prompts are issued concurrently.
+    Each split answer is also stored under its single-prompt LLM cache key, so plain calls in later runs hit it.
+    A combined reply that cannot be split is retried as single prompts, and combining is then
+    turned off for the rest of the run so it does not cost a second round-trip again.
+    With window = 0 (default) every call is sent as soon as it arrives.
+    """
+
+    def __init__(self, window: float, max_group: int) -> None:
+        self.answers: Dict[str, str] = {}
+        self._window = window
+        self._max_group = max_group
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, str, Future]] = []
+        self._full = threading.Event()
+        self._inflight: Dict[str, Future] = {}
+
+    def extract(self, key: str, text: str, prompt: str) -> str:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = False
+            if future is None:
+                future = self._inflight[key] = Future()
+                leader = not self._pending
+                if leader:
+                    self._full = threading.Event()
+                full = self._full
+                self._pending.append((key, text, prompt, future))
+                if len(self._pending) >= self._max_group:
+                    full.set()
+        if leader:
+            if self._window > 0:
+                full.wait(self._window)
+            with self._lock:
+                group, self._pending = self._pending, []
+            self._run(group)
+        return future.result()
+
+    def _chunks(self, group: List[Tuple[str, str, str, Future]]) -> List[List[Tuple[str, str, str, Future]]]:
+        """Pack the group into combined-prompt chunks of at most EXTRACT_MAX_CHARS profile text."""
+        if self._window <= 0 or len(group) == 1:
+            return [[item] for item in group]
+        # Profiles already answered in the LLM cache are sent alone (complete() serves them from the cache)
+        chunks: List[List[Tuple[str, str, str, Future]]] = []
+        size = EXTRACT_MAX_CHARS
+        for item in group:
+            if cached_completion(item[2]) is not None:
+                chunks.append([item])
+                size = EXTRACT_MAX_CHARS
+                continue
+            if size + len(item[1]) > EXTRACT_MAX_CHARS:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(item)
+            size += len(item[1])
+        return chunks
+
+    def _run(self, group: List[Tuple[str, str, str, Future]]) -> None:
+        chunks = self._chunks(group)
+        prompts = [
+            chunk[0][2] if len(chunk) == 1 else _EXTRACT_MULTI_PREFIX + "\n\n".join(
+                f"--- profile {i} ---\n{text}" for i, (_, text, _, _) in enumerate(chunk, 1)
+            )
+            for chunk in chunks
+        ]
+        try:
+            answers: Dict[int, Optional[str]] = {}
+            for chunk, reply in zip(chunks, _llm_complete_batch(prompts)):
+                if len(chunk) == 1:
+                    answers[id(chunk[0])] = reply
+                    continue
+                for item, part in zip(chunk, _split_multi_reply(reply, len(chunk))):
+                    answers[id(item)] = part
+                    if part is not None:
+                        cache_completion(item[2], part)
+            missing = [item for item in group if answers[id(item)] is None]
+            if missing:
+                self._window = 0.0
+                answers.update(zip(map(id, missing), _llm_complete_batch([item[2] for item in missing])))
+            for item in group:
+                item[3].set_result(answers[id(item)])
+        except Exception as e:
+            for item in group:
+                if not item[3].done():
+                    item[3].set_exception(e)
+        finally:
+            with self._lock:
+                for item in group:
+                    self._inflight.pop(item[0], None)
 
 
-def _make_extract_insights_fn(profile_text_in_scope: str) -> Callable[..., str]:
-    """Build extract_insights that closes over profile_text (used when profile is in scope for this run)."""
+def _insights_key(text: str) -> str:
+    """Cache key for a (truncated) profile text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _extract_cached(extractor: _RunExtractor, key: str, text: str, prompt: str) -> str:
+    """
+    Answer the extraction prompt built from text (already truncated; key = _insights_key(text)). Answers are
+    kept in the run's extractor under that key, so re-extracting the same profile within one run is free.
+    Across runs and processes, the same prompt is answered by local_llm's on-disk prompt cache (llm_cache).
+    """
+    insights = extractor.answers.get(key)
+    if insights is None:
+        insights = extractor.extract(key, text, prompt)
+        if insights:
+            extractor.answers[key] = insights
+    return insights
+
+
+def _extract_text(extractor: _RunExtractor, text: str) -> str:
+    """Truncate text and run the (cached) extraction prompt over it."""
+    text = text[:EXTRACT_MAX_CHARS]
+    return _extract_cached(extractor, _insights_key(text), text, _EXTRACT_PREFIX + text)
+
+
+def _make_extract_insights_fn(profile_text_in_scope: str, extractor: _RunExtractor) -> Callable[..., str]:
+    """
+    Build extract_insights that closes over profile_text (used when profile is in scope for this run).
+    The in-scope profile is truncated, hashed and its prompt built once here; calls without profile_text
+    reuse them. Only the truncated text is kept, so a large raw profile is not held for the whole run.
+    """
+    truncated = (profile_text_in_scope or "")[:EXTRACT_MAX_CHARS]
+    default_prompt = _EXTRACT_PREFIX + truncated
+    default_key = _insights_key(truncated)
 
     def _extract_insights(profile_text: Optional[str] = None) -> str:
-        from local_llm import complete
-        text = (profile_text or "").strip() or profile_text_in_scope
-        if not text:
+        text = (profile_text or "").strip()
+        if text:
+            return _extract_text(extractor, text)
+        if not truncated:
             return "No profile text provided to extract insights from."
-        prompt = EXTRACT_INSIGHTS_PROMPT.format(profile_text=text[:8000])
-        return complete(prompt)
+        return _extract_cached(extractor, default_key, truncated, default_prompt)
 
     return _extract_insights
 
 
-def _extract_insights_no_profile(profile_text: Optional[str] = None) -> str:
-    """Fallback when no profile in scope; profile should be in task context. Model can pass a snippet via tool_input."""
-    from local_llm import complete
-    if not profile_text or not str(profile_text).strip():
-        return "No profile text in this call. The company profile is in the task context above; use it to reason and then stop with your answer."
-    prompt = EXTRACT_INSIGHTS_PROMPT.format(profile_text=str(profile_text)[:8000])
-    return complete(prompt)
+def _make_extract_insights_no_profile_fn(extractor: _RunExtractor) -> Callable[..., str]:
+    """Build extract_insights for when no profile is in scope; profile should be in task context."""
+
+    def _extract_insights_no_profile(profile_text: Optional[str] = None) -> str:
+        """Model can pass a snippet via tool_input."""
+        if not profile_text or not str(profile_text).strip():
+            return "No profile text in this call. The company profile is in the task context above; use it to reason and then stop with your answer."
+        return _extract_text(extractor, str(profile_text))
+
+    return _extract_insights_no_profile
 
 
 def _make_save_note_fn(memory: "AgentMemory") -> Callable[..., str]:
-    """Build save_note that writes into the given AgentMemory (shown in context next step)."""
+    """
+    Build save_note that writes into the given AgentMemory (shown in context next step).
+    Repeats of a note memory still holds are not stored again (see AgentMemory.add_saved_note).
+    """
+    add_saved_note = memory.add_saved_note  # bound once, not looked up on every save
 
     def save_note(content: str) -> str:
-        if not (content and str(content).strip()):
+        note = str(content).strip() if content else ""
+        if not note:
             return "No content provided; nothing saved."
-        memory.add_saved_note(str(content).strip())
+        if not add_saved_note(note):
+            return "Already saved; it is in your saved notes."
         return "Saved. This will be available in the next step."
 
     return save_note
 
 
-def _safe_call(fn: Callable[..., Any], **kwargs: Any) -> Any:
-    """Run tool fn with kwargs; let caller handle exceptions for visibility."""
-    return fn(**kwargs)
+def _make_batch_fn(registry: Dict[str, "ToolSpec"]) -> Callable[..., str]:
+    """
+    Build the batch meta-tool: run several tool invocations from one decision concurrently.
+    Tools are blocking (web, LLM), so the invocations run together via run_tools; results keep input order.
+    """
+
+    def batch(invocations: Optional[list] = None) -> str:
+        calls = []
+        for inv in (invocations or [])[:BATCH_MAX_INVOCATIONS]:
+            if not isinstance(inv, dict):
+                continue
+            tool_id = sys.intern(str(inv.get("tool_name") or inv.get("tool_id") or "").strip())
+            arguments = inv.get("arguments") or inv.get("tool_input") or {}
+            calls.append((tool_id, arguments if isinstance(arguments, dict) else {}))
+        if not calls:
+            return "No invocations provided. Pass 'invocations': [{\"tool_name\": ..., \"arguments\": {...}}, ...]."
+
+        results = iter(run_tools(registry, [c for c in calls if c[0] != "batch"], return_exceptions=True))
+        parts = []
+        for i, (tool_id, _) in enumerate(calls, 1):
+            result = ValueError("batch cannot be nested") if tool_id == "batch" else next(results)
+            if isinstance(result, Exception):
+                parts.append(f"[{i}] {tool_id} failed: {result}")
+            else:
+                parts.append(f"[{i}] {tool_id} result: {result}")
+        return "\n\n".join(parts)
+
+    return batch
+
+
+# Rendered prompt lines, shared across registries: (tool_id, description, id(parameters)) -> (parameters, line).
+# Every registry reuses the same static parameter dicts, so each line is serialized once per process. The
+# entry holds the parameters object, so its id cannot be reused by another dict while the line is cached.
+_DESC_CACHE: Dict[Tuple[str, str, int], Tuple[Any, str]] = {}
+_DESC_CACHE_MAX_ENTRIES = 256
+
+
+def render_tool_description(tool_id: str, spec: ToolSpec) -> str:
+    """
+    One prompt line for a tool: id, description, and parameters as compact JSON with sorted keys,
+    so the same spec always renders to the same bytes (stable prompt prefix).
+    Parameters are serialized only on a cache miss; specs must not be mutated once rendered.
+    """
+    params = spec.get("parameters", {})
+    description = str(spec.get("description", ""))
+    key = (tool_id, description, id(params))
+    hit = _DESC_CACHE.get(key)
+    if hit is not None:
+        return hit[1]
+    line = f"- {tool_id}: {description} (params: {json.dumps(params, separators=(',', ':'), sort_keys=True)})"
+    if len(_DESC_CACHE) >= _DESC_CACHE_MAX_ENTRIES:
+        _DESC_CACHE.clear()
+    _DESC_CACHE[key] = (params, line)
+    return line
+
+
+# Static parts of the tool specs, built once at import. get_tool_registry copies a template and binds the
+# per-run "fn"; search_web keeps no per-run state, so its spec (prompt line included) is shared as-is.
+_EXTRACT_INSIGHTS_SPEC_TEMPLATE: ToolSpec = {
+    "id": "extract_insights",
+    "description": "Extract key facts, pain points, and opportunities from the company profile text. Use this to structure the profile before proposing value hypothesis and messaging.",
+    "parameters": None,
+}
+# Model can call with empty args when the profile is in scope; we use the closed-over profile
+_EXTRACT_PARAMS_IN_SCOPE = {"profile_text": "optional profile_text; the profile is already in scope for this run"}
+_EXTRACT_PARAMS_IN_CONTEXT = {"profile_text": "optional profile_text; if not provided, profile is in the task context"}
+_SEARCH_WEB_SPEC: ToolSpec = {
+    "id": "search_web",
+    "description": "Search the web (DuckDuckGo) for current information. Use when you need company info, industry trends, or supporting evidence not in the profile. Pass 'query' (search string) and optionally 'max_results' (default 5).",
+    "parameters": {"query": "search query string", "max_results": "optional, number of results (default 5)"},
+    "fn": search_web,
+}
+_SEARCH_WEB_SPEC["_rendered"] = render_tool_description("search_web", _SEARCH_WEB_SPEC)
+_SAVE_NOTE_SPEC_TEMPLATE: ToolSpec = {
+    "id": "save_note",
+    "description": "Save a fact or finding for the next step. Use after search_web or extract_insights to store key points so you don't re-invent or hallucinate later. Pass 'content' (string to save). Saved notes appear in your context on subsequent steps.",
+    "parameters": {"content": "string to save (key fact, quote, or finding)"},
+}
+_BATCH_SPEC_TEMPLATE: ToolSpec = {
+    "id": "batch",
+    "description": "Run several independent tools at once in this step (e.g. search_web and extract_insights together). Pass 'invocations': a list of {\"tool_name\": ..., \"arguments\": {...}}. Results come back numbered in the same order.",
+    "parameters": {"invocations": "list of {tool_name, arguments} objects"},
+}
 
 
 def get_tool_registry(
@@ -102,46 +423,126 @@ def get_tool_registry(
     When profile_text is provided (sales-rep flow), extract_insights uses it. Otherwise the tool
     expects profile to be in the task context or passed via tool_input.
     When memory is provided, save_note is available so the model can persist facts for the next step.
+    batch is always available and runs other tools from this registry concurrently.
+    Each spec carries its pre-rendered prompt line under "_rendered". Specs are shared static
+    templates with "fn" bound per call, so callers must not mutate them.
     """
+    # Per-registry (per-run) extraction cache and coalescing: dropped with the registry at the end of the run
+    extractor = _RunExtractor(EXTRACT_COALESCE_WINDOW_SECONDS, EXTRACT_COALESCE_MAX)
+    extract_spec = _EXTRACT_INSIGHTS_SPEC_TEMPLATE.copy()
     if profile_text is not None:
-        fn = _make_extract_insights_fn(profile_text)
-        # Model can call with empty args; we use closed-over profile
-        params = "optional profile_text; the profile is already in scope for this run"
+        extract_spec["parameters"] = _EXTRACT_PARAMS_IN_SCOPE
+        extract_spec["fn"] = _make_extract_insights_fn(profile_text, extractor)
     else:
-        fn = _extract_insights_no_profile
-        params = "optional profile_text; if not provided, profile is in the task context"
-    registry = {
-        "extract_insights": {
-            "id": "extract_insights",
-            "description": "Extract key facts, pain points, and opportunities from the company profile text. Use this to structure the profile before proposing value hypothesis and messaging.",
-            "parameters": {"profile_text": params},
-            "fn": fn,
-        },
-        "search_web": {
-            "id": "search_web",
-            "description": "Search the web (DuckDuckGo) for current information. Use when you need company info, industry trends, or supporting evidence not in the profile. Pass 'query' (search string) and optionally 'max_results' (default 5).",
-            "parameters": {"query": "search query string", "max_results": "optional, number of results (default 5)"},
-            "fn": search_web,
-        },
-    }
+        extract_spec["parameters"] = _EXTRACT_PARAMS_IN_CONTEXT
+        extract_spec["fn"] = _make_extract_insights_no_profile_fn(extractor)
+    registry = {"extract_insights": extract_spec, "search_web": _SEARCH_WEB_SPEC}
     if memory is not None:
-        registry["save_note"] = {
-            "id": "save_note",
-            "description": "Save a fact or finding for the next step. Use after search_web or extract_insights to store key points so you don't re-invent or hallucinate later. Pass 'content' (string to save). Saved notes appear in your context on subsequent steps.",
-            "parameters": {"content": "string to save (key fact, quote, or finding)"},
-            "fn": _make_save_note_fn(memory),
-        }
+        save_note_spec = _SAVE_NOTE_SPEC_TEMPLATE.copy()
+        save_note_spec["fn"] = _make_save_note_fn(memory)
+        registry["save_note"] = save_note_spec
+    batch_spec = _BATCH_SPEC_TEMPLATE.copy()
+    batch_spec["fn"] = _make_batch_fn(registry)
+    registry["batch"] = batch_spec
+    # Prompt lines come from the process-wide render cache; search_web's was rendered at import
+    for tool_id, spec in registry.items():
+        if "_rendered" not in spec:
+            spec["_rendered"] = render_tool_description(tool_id, spec)
     return registry
 
 
+# Speculative tool runs: (registry id, tool fn, canonical JSON of tool_input) -> Future, oldest first.
+# Keyed by registry and fn (not the tool_id) so one run's prefetched extract_insights is never served to
+# another run; discard_prefetches drops a run's leftovers when it ends. One worker per concurrent run.
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_MAX_CONCURRENCY, thread_name_prefix="tool-prefetch")
+_PREFETCHED: "OrderedDict[Tuple[int, Callable[..., Any], str], Future]" = OrderedDict()
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _prefetch_key(
+    registry: Dict[str, ToolSpec], fn: Callable[..., Any], tool_input: Dict[str, Any]
+) -> Tuple[int, Callable[..., Any], str]:
+    return id(registry), fn, json.dumps(tool_input, sort_keys=True, default=str)
+
+
+def prefetch(registry: Dict[str, ToolSpec], tool_id: str, tool_input: Dict[str, Any]) -> bool:
+    """
+    Start tool_id(**tool_input) in the background, ahead of the model choosing it. A later run_tool with the
+    same tool and arguments waits for this result instead of calling the tool again.
+    Only PREFETCHABLE_TOOLS are run; returns whether a prefetch was started.
+    """
+    spec = registry.get(tool_id)
+    if spec is None or tool_id not in PREFETCHABLE_TOOLS:
+        return False
+    fn = spec["fn"]
+    key = _prefetch_key(registry, fn, tool_input)
+    with _PREFETCH_LOCK:
+        if key in _PREFETCHED:
+            return False
+        _PREFETCHED[key] = _PREFETCH_EXECUTOR.submit(fn, **tool_input)
+        while len(_PREFETCHED) > PREFETCH_MAX_PENDING:
+            _PREFETCHED.popitem(last=False)[1].cancel()
+    return True
+
+
+def discard_prefetches(registry: Dict[str, ToolSpec]) -> None:
+    """Drop this registry's unclaimed prefetches (call when its run ends); ones not started yet are cancelled."""
+    registry_id = id(registry)
+    with _PREFETCH_LOCK:
+        for key in [key for key in _PREFETCHED if key[0] == registry_id]:
+            _PREFETCHED.pop(key).cancel()
+
+
 def run_tool(registry: Dict[str, ToolSpec], tool_id: str, tool_input: Dict[str, Any]) -> Any:
     """
     Execute the tool selected by the model. Called from the agent loop after Decide.
     Raises on unknown tool_id; caller catches and passes error into Observe/memory.
+    A matching prefetch (see prefetch) that is running or done is claimed instead of calling the tool again;
+    one still queued behind other runs' prefetches is cancelled and the tool runs here instead.
     """
-    if tool_id not in registry:
-        raise ValueError(f"Unknown tool: {tool_id}. Available: {list(registry.keys())}")
-    spec = registry[tool_id]
+    spec = registry.get(tool_id)
+    if spec is None:
+        raise ValueError(f"Unknown tool: {tool_id}. Available: {list(registry)}")
     fn = spec["fn"]
-    # Pass through tool_input; extract_insights may have profile_text or empty dict
-    return _safe_call(fn, **tool_input)
+    if _PREFETCHED:
+        with _PREFETCH_LOCK:
+            future = _PREFETCHED.pop(_prefetch_key(registry, fn, tool_input), None)
+        if future is not None and not future.cancel():
+            return future.result()
+    # Pass through tool_input; extract_insights may have profile_text or empty dict.
+    # Exceptions propagate to the caller, which reports them in Observe/memory.
+    return fn(**tool_input)
+
+
+# Persistent worker pool for run_tools (tools are blocking web/LLM calls), shared by all registries
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool")
+
+
+def run_tools(
+    registry: Dict[str, ToolSpec],
+    calls: List[Tuple[str, Dict[str, Any]]],
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Run several independent (tool_id, tool_input) calls concurrently on a shared thread pool, so the
+    batch takes as long as the slowest call. Results are in call order. As with asyncio.gather, the first
+    failure is raised unless return_exceptions is set, in which case exceptions are returned in place.
+    """
+    if len(calls) == 1:
+        # Nothing to overlap: run in the caller's thread
+        tool_id, tool_input = calls[0]
+        try:
+            return [run_tool(registry, tool_id, tool_input)]
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return [e]
+    futures = [_TOOL_EXECUTOR.submit(run_tool, registry, tool_id, tool_input) for tool_id, tool_input in calls]
+    if not return_exceptions:
+        return [f.result() for f in futures]
+    return [f.exception() or f.result() for f in futures]
+
+
+async def arun_tool(registry: Dict[str, ToolSpec], tool_id: str, tool_input: Dict[str, Any]) -> Any:
+    """Async twin of run_tool: runs the (blocking) tool in a worker thread so the event loop stays free."""
+    return await asyncio.to_thread(run_tool, registry, tool_id, tool_input)